@@ -724,13 +724,13 @@ class DefaultStackAdvisor(StackAdvisor):
                 break
 
           if hasattr(service_advisor, best_class_name):
-            self.logger.info("ServiceAdvisor implementation for service {0} was loaded".format(service_name))
+            self.logger.info("ServiceAdvisor implementation for service %s was loaded", service_name)
             return getattr(service_advisor, best_class_name)()
           else:
-            self.logger.error("Failed to load or create ServiceAdvisor implementation for service {0}: " \
-                  "Expecting class name {1} but it was not found.".format(service_name, best_class_name))
+            self.logger.error("Failed to load or create ServiceAdvisor implementation for service %s: " \
+                  "Expecting class name %s but it was not found.", service_name, best_class_name)
       except Exception as e:
-        self.logger.exception("Failed to load or create ServiceAdvisor implementation for service {0}".format(service_name))
+        self.logger.exception("Failed to load or create ServiceAdvisor implementation for service %s", service_name)
 
     return None
 
@@ -1323,7 +1323,7 @@ class DefaultStackAdvisor(StackAdvisor):
     if cluster["hBaseInstalled"]:
       totalAvailableRam -= cluster["hbaseRam"]
     cluster["totalAvailableRam"] = max(512, totalAvailableRam * 1024)
-    self.logger.info("Memory for YARN apps - cluster[totalAvailableRam]: " + str(cluster["totalAvailableRam"]))
+    self.logger.info("Memory for YARN apps - cluster[totalAvailableRam]: %s", cluster["totalAvailableRam"])
 
     suggestedMinContainerRam = 1024   # new smaller value for YARN min container
     callContext = self.getCallContext(services)
@@ -1331,34 +1331,33 @@ class DefaultStackAdvisor(StackAdvisor):
     operation = self.getUserOperationContext(services, DefaultStackAdvisor.OPERATION)
     adding_yarn = self.isServiceBeingAdded(services, 'YARN')
     if operation:
-      self.logger.info("user operation context : " + str(operation))
+      self.logger.info("user operation context : %s", operation)
 
     if services:  # its never None but some unit tests pass it as None
       # If min container value is changed (user is changing it)
       # if its a validation call - just use what ever value is set
       # If its a recommend attribute call (when UI lands on a page)
       # If add service but YARN is not being added
-      if self.getOldValue(services, "yarn-site", "yarn.scheduler.minimum-allocation-mb") or \
+      oldMinContainerSize = self.getOldValue(services, "yarn-site", "yarn.scheduler.minimum-allocation-mb")
+      if oldMinContainerSize or \
               'recommendConfigurations' != callContext or \
               operation == DefaultStackAdvisor.RECOMMEND_ATTRIBUTE_OPERATION or \
           (operation == DefaultStackAdvisor.ADD_SERVICE_OPERATION and not adding_yarn):
 
-        self.logger.info("Full context: callContext = " + str(callContext) +
-                    " and operation = " + str(operation) + " and adding YARN = " + str(adding_yarn) +
-                    " and old value exists = " +
-                    str(self.getOldValue(services, "yarn-site", "yarn.scheduler.minimum-allocation-mb")))
+        self.logger.info("Full context: callContext = %s and operation = %s and adding YARN = %s and old value exists = %s",
+                         callContext, operation, adding_yarn, oldMinContainerSize)
 
         '''yarn.scheduler.minimum-allocation-mb has changed - then pick this value up'''
         if "yarn-site" in services["configurations"] and \
                 "yarn.scheduler.minimum-allocation-mb" in services["configurations"]["yarn-site"]["properties"] and \
             str(services["configurations"]["yarn-site"]["properties"]["yarn.scheduler.minimum-allocation-mb"]).isdigit():
-          self.logger.info("Using user provided yarn.scheduler.minimum-allocation-mb = " +
-                      str(services["configurations"]["yarn-site"]["properties"]["yarn.scheduler.minimum-allocation-mb"]))
+          self.logger.info("Using user provided yarn.scheduler.minimum-allocation-mb = %s",
+                           services["configurations"]["yarn-site"]["properties"]["yarn.scheduler.minimum-allocation-mb"])
           cluster["yarnMinContainerSize"] = int(services["configurations"]["yarn-site"]["properties"]["yarn.scheduler.minimum-allocation-mb"])
-          self.logger.info("Minimum ram per container due to user input - cluster[yarnMinContainerSize]: " + str(cluster["yarnMinContainerSize"]))
+          self.logger.info("Minimum ram per container due to user input - cluster[yarnMinContainerSize]: %s", cluster["yarnMinContainerSize"])
           if cluster["yarnMinContainerSize"] > cluster["totalAvailableRam"]:
             cluster["yarnMinContainerSize"] = cluster["totalAvailableRam"]
-            self.logger.info("Minimum ram per container after checking against limit - cluster[yarnMinContainerSize]: " + str(cluster["yarnMinContainerSize"]))
+            self.logger.info("Minimum ram per container after checking against limit - cluster[yarnMinContainerSize]: %s", cluster["yarnMinContainerSize"])
             pass
           cluster["minContainerSize"] = cluster["yarnMinContainerSize"]    # set to what user has suggested as YARN min container size
           suggestedMinContainerRam = cluster["yarnMinContainerSize"]
@@ -1373,7 +1372,7 @@ class DefaultStackAdvisor(StackAdvisor):
                                           min(core_multiplier * cluster["cpu"],
                                               min(ceil(1.8 * cluster["disk"]),
                                                   cluster["totalAvailableRam"] / cluster["minContainerSize"])))))
-    self.logger.info("Containers per node - cluster[containers]: " + str(cluster["containers"]))
+    self.logger.info("Containers per node - cluster[containers]: %s", cluster["containers"])
 
     if cluster["containers"] * cluster["minContainerSize"] > cluster["totalAvailableRam"]:
       cluster["containers"] = int(ceil(cluster["totalAvailableRam"] / cluster["minContainerSize"]))
@@ -1382,7 +1381,7 @@ class DefaultStackAdvisor(StackAdvisor):
 
     cluster["ramPerContainer"] = int(abs(cluster["totalAvailableRam"] / cluster["containers"]))
     cluster["yarnMinContainerSize"] = min(suggestedMinContainerRam, cluster["ramPerContainer"])
-    self.logger.info("Ram per containers before normalization - cluster[ramPerContainer]: " + str(cluster["ramPerContainer"]))
+    self.logger.info("Ram per containers before normalization - cluster[ramPerContainer]: %s", cluster["ramPerContainer"])
 
     '''If greater than cluster["yarnMinContainerSize"], value will be in multiples of cluster["yarnMinContainerSize"]'''
     if cluster["ramPerContainer"] > cluster["yarnMinContainerSize"]:
@@ -1393,10 +1392,10 @@ class DefaultStackAdvisor(StackAdvisor):
     cluster["reduceMemory"] = cluster["ramPerContainer"]
     cluster["amMemory"] = max(cluster["mapMemory"], cluster["reduceMemory"])
 
-    self.logger.info("Min container size - cluster[yarnMinContainerSize]: " + str(cluster["yarnMinContainerSize"]))
-    self.logger.info("Available memory for map - cluster[mapMemory]: " + str(cluster["mapMemory"]))
-    self.logger.info("Available memory for reduce - cluster[reduceMemory]: " + str(cluster["reduceMemory"]))
-    self.logger.info("Available memory for am - cluster[amMemory]: " + str(cluster["amMemory"]))
+    self.logger.info("Min container size - cluster[yarnMinContainerSize]: %s", cluster["yarnMinContainerSize"])
+    self.logger.info("Available memory for map - cluster[mapMemory]: %s", cluster["mapMemory"])
+    self.logger.info("Available memory for reduce - cluster[reduceMemory]: %s", cluster["reduceMemory"])
+    self.logger.info("Available memory for am - cluster[amMemory]: %s", cluster["amMemory"])
 
 
     return cluster
@@ -1404,7 +1403,7 @@ class DefaultStackAdvisor(StackAdvisor):
   def getCallContext(self, services):
     if services:
       if DefaultStackAdvisor.ADVISOR_CONTEXT in services:
-        self.logger.info("call type context : " + str(services[DefaultStackAdvisor.ADVISOR_CONTEXT]))
+        self.logger.info("call type context : %s", services[DefaultStackAdvisor.ADVISOR_CONTEXT])
         return services[DefaultStackAdvisor.ADVISOR_CONTEXT][DefaultStackAdvisor.CALL_TYPE]
     return ""
 
@@ -1550,9 +1549,9 @@ class DefaultStackAdvisor(StackAdvisor):
         siteProperties = self.getSiteProperties(configurations, configType)
         if siteProperties is not None:
           siteRecommendations = recommendedDefaults[configType]["properties"]
-          self.logger.info("SiteName: %s, method: %s" % (configType, method.__name__))
-          self.logger.info("Site properties: %s" % str(siteProperties))
-          self.logger.info("Recommendations: %s" % str(siteRecommendations))
+          self.logger.info("SiteName: %s, method: %s", configType, method.__name__)
+          self.logger.info("Site properties: %s", siteProperties)
+          self.logger.info("Recommendations: %s", siteRecommendations)
           validationItems = method(siteProperties, siteRecommendations, configurations, services, hosts)
           items.extend(validationItems)
     return items
@@ -1566,9 +1565,9 @@ class DefaultStackAdvisor(StackAdvisor):
       siteProperties = self.getSiteProperties(configurations, siteName)
       if siteProperties is not None:
         siteRecommendations = recommendedDefaults[siteName]["properties"]
-        self.logger.info("SiteName: %s, method: %s" % (siteName, method.__name__))
-        self.logger.info("Site properties: %s" % str(siteProperties))
-        self.logger.info("Recommendations: %s" % str(siteRecommendations))
+        self.logger.info("SiteName: %s, method: %s", siteName, method.__name__)
+        self.logger.info("Site properties: %s", siteProperties)
+        self.logger.info("Recommendations: %s", siteRecommendations)
         return method(siteProperties, siteRecommendations, configurations, services, hosts)
     return []
 
@@ -2731,7 +2730,7 @@ class DefaultStackAdvisor(StackAdvisor):
     }
 
   def _getHadoopProxyUsersForService(self, serviceName, serviceUserComponents, services, hosts, configurations):
-    self.logger.info("Calculating Hadoop Proxy User recommendations for {0} service.".format(serviceName))
+    self.logger.info("Calculating Hadoop Proxy User recommendations for %s service.", serviceName)
     servicesList = self.get_services_list(services)
     resultUsers = {}
 
@@ -2763,7 +2762,7 @@ class DefaultStackAdvisor(StackAdvisor):
                   componentHostNames.add(componentHostName)
 
             componentHostNamesString = ",".join(sorted(componentHostNames))
-            self.logger.info("Host List for [service='{0}'; user='{1}'; components='{2}']: {3}".format(serviceName, user, ','.join(hostSelector), componentHostNamesString))
+            self.logger.info("Host List for [service='%s'; user='%s'; components='%s']: %s", serviceName, user, ','.join(hostSelector), componentHostNamesString)
 
           if not proxyPropertyName in proxyUsers:
             proxyUsers[proxyPropertyName] = componentHostNamesString
@@ -2794,7 +2793,7 @@ class DefaultStackAdvisor(StackAdvisor):
 
       # Add properties "hadoop.proxyuser.*.hosts", "hadoop.proxyuser.*.groups" to core-site for all users
       self.put_proxyuser_value(user_name, user_properties["propertyHosts"], services=services, configurations=configurations, put_function=putCoreSiteProperty)
-      self.logger.info("Updated hadoop.proxyuser.{0}.hosts as : {1}".format(user_name, user_properties["propertyHosts"]))
+      self.logger.info("Updated hadoop.proxyuser.%s.hosts as : %s", user_name, user_properties["propertyHosts"])
       if "propertyGroups" in user_properties:
         self.put_proxyuser_value(user_name, user_properties["propertyGroups"], is_groups=True, services=services, configurations=configurations, put_function=putCoreSiteProperty)
 
@@ -3220,7 +3219,7 @@ class DefaultStackAdvisor(StackAdvisor):
               capacity_scheduler_properties[key] = value
             self.logger.info("'capacity-scheduler' configs is passed-in as a single '\\n' separated string. "
                         "count(services['configurations']['capacity-scheduler']['properties']['capacity-scheduler']) = "
-                        "{0}".format(len(capacity_scheduler_properties)))
+                        "%s", len(capacity_scheduler_properties))
             received_as_key_value_pair = False
           else:
             self.logger.info("Passed-in services['configurations']['capacity-scheduler']['properties']['capacity-scheduler'] is 'null'.")
@@ -3231,12 +3230,12 @@ class DefaultStackAdvisor(StackAdvisor):
         # Received configs as a dictionary (Generally on 1st invocation).
         capacity_scheduler_properties = services['configurations']["capacity-scheduler"]["properties"]
         self.logger.info("'capacity-scheduler' configs is passed-in as a dictionary. "
-                    "count(services['configurations']['capacity-scheduler']['properties']) = {0}".format(len(capacity_scheduler_properties)))
+                    "count(services['configurations']['capacity-scheduler']['properties']) = %s", len(capacity_scheduler_properties))
     else:
       self.logger.error("Couldn't retrieve 'capacity-scheduler' from services.")
 
-    self.logger.info("Retrieved 'capacity-scheduler' received as dictionary : '{0}'. configs : {1}" \
-                .format(received_as_key_value_pair, capacity_scheduler_properties.items()))
+    self.logger.info("Retrieved 'capacity-scheduler' received as dictionary : '%s'. configs : %s",
+                     received_as_key_value_pair, capacity_scheduler_properties.items())
     return capacity_scheduler_properties, received_as_key_value_pair
 
   def getAllYarnLeafQueues(self, capacitySchedulerProperties):
@@ -20,24 +20,231 @@ import math
 import re
 import os
 import sys
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import chain
 from math import ceil, floor
 
 from stack_advisor import DefaultStackAdvisor
 
 DB_TYPE_DEFAULT_PORT_MAP = {"MYSQL":"3306", "ORACLE":"1521", "POSTGRES":"5432", "MSSQL":"1433", "SQLA":"2638"}
 
+# Ranger DB_FLAVOR -> (ranger.jpa.jdbc.driver, ranger.jpa.jdbc.url, ranger_privelege_user_jdbc_url),
+# the URLs are filled with the DB host:port and the DB name
+RANGER_DB_PROPERTIES = {
+  'MYSQL': ('com.mysql.jdbc.Driver', 'jdbc:mysql://{0}/{1}', 'jdbc:mysql://{0}'),
+  'ORACLE': ('oracle.jdbc.driver.OracleDriver', 'jdbc:oracle:thin:@//{0}', 'jdbc:oracle:thin:@//{0}'),
+  'POSTGRES': ('org.postgresql.Driver', 'jdbc:postgresql://{0}/{1}', 'jdbc:postgresql://{0}/postgres'),
+  'MSSQL': ('com.microsoft.sqlserver.jdbc.SQLServerDriver', 'jdbc:sqlserver://{0};databaseName={1}', 'jdbc:sqlserver://{0};'),
+  'SQLA': ('sap.jdbc4.sqlanywhere.IDriver', 'jdbc:sqlanywhere:host={0};database={1}', 'jdbc:sqlanywhere:host={0};')
+}
+
+# Services with a Ranger plugin, their audit config type and the service user
+# recommended as the ranger-admin-site plugin service user
+RANGER_SERVICES = (
+  {'service_name': 'KAFKA', 'audit_file': 'ranger-kafka-audit',
+   'file_name': 'kafka-env', 'config_name': 'kafka_user', 'target_configname': 'ranger.plugins.kafka.serviceuser'},
+  {'service_name': 'STORM', 'audit_file': 'ranger-storm-audit',
+   'file_name': 'storm-env', 'config_name': 'storm_user', 'target_configname': 'ranger.plugins.storm.serviceuser'},
+  {'service_name': 'NIFI', 'audit_file': 'ranger-nifi-audit',
+   'file_name': 'nifi-env', 'config_name': 'nifi_user', 'target_configname': 'ranger.plugins.nifi.serviceuser'}
+)
+# Ranger properties copied into every plugin's audit config type
+RANGER_AUDIT_PROPERTIES = (
+  {'filename': 'ranger-env', 'configname': 'xasecure.audit.destination.solr', 'target_configname': 'xasecure.audit.destination.solr'},
+  {'filename': 'ranger-admin-site', 'configname': 'ranger.audit.solr.urls', 'target_configname': 'xasecure.audit.destination.solr.urls'},
+  {'filename': 'ranger-admin-site', 'configname': 'ranger.audit.solr.zookeepers', 'target_configname': 'xasecure.audit.destination.solr.zookeepers'}
+)
+
+# Upper bounds (GB) of the reference host RAM brackets and the (os, hbase) RAM (GB) reserved in each bracket
+RESERVED_RAM_THRESHOLDS = (4, 8, 16, 24, 48, 64, 72, 96, 128, 256)
+RESERVED_RAM_RECOMMENDATIONS = ((1, 1), (2, 1), (2, 2), (4, 4), (6, 8), (8, 8), (8, 8), (12, 16), (24, 24), (32, 32), (64, 32))
+# Upper bounds (GB) of the reference host RAM brackets and the minimum container size (MB) in each bracket
+MIN_CONTAINER_SIZE_THRESHOLDS = (4, 8, 24)
+MIN_CONTAINER_SIZES = (256, 512, 1024, 2048)
+
+# Mount points and file system types never preferred for data directories,
+# '/etc/resolv.conf', '/etc/hostname', '/etc/hosts' are docker specific mount points
+UNDESIRABLE_MOUNT_POINTS = frozenset(["/", "/home", "/etc/resolv.conf", "/etc/hosts", "/etc/hostname", "/tmp"])
+UNDESIRABLE_FS_TYPES = frozenset(["devtmpfs", "tmpfs", "vboxsf", "CDFS"])
+
+# Component groups the base layout logic tests membership against
+MASTERS_WITH_MULTIPLE_INSTANCES = frozenset(['ZOOKEEPER_SERVER', 'METRICS_COLLECTOR'])
+NOT_VALUABLE_COMPONENTS = frozenset(['METRICS_MONITOR'])
+NOT_PREFERABLE_ON_SERVER_COMPONENTS = frozenset(['STORM_UI_SERVER', 'DRPC_SERVER', 'STORM_REST_API', 'NIMBUS', 'METRICS_COLLECTOR'])
+
+# Regular expressions used by the recommenders and the validation helpers, compiled once
+FILE_SCHEME_PATTERN = re.compile("^file://")
+LOCAL_DIR_PREFIX_PATTERN = re.compile("^file:///|/")
+NON_DIGIT_PATTERN = re.compile("\D")
+XMX_VALUE_PATTERN = re.compile('-Xmx(\d+)(b|k|m|g|p|t|B|K|M|G|P|T)?')
+XMX_SIZE_PATTERN = re.compile("-Xmx(\d+)(.?)")
+ADDRESS_PORT_PATTERN = re.compile(r'(?:http(?:s)?://)?([\w\d.]*):(\d{1,5})')
+
+# Validation message templates
+XMN_SIZE_BELOW_MIN_MESSAGE = "Value is lesser than the recommended minimum Xmn size of {0} (12% of {1})"
+XMN_SIZE_ABOVE_MAX_MESSAGE = "Value is greater than the recommended maximum Xmn size of {0} (20% of {1})"
+COLLECTOR_HOST_SHARED_MESSAGE = "Host {0} is used by multiple master components ({1}). " \
+                                "It is recommended to use a separate host for the " \
+                                "Ambari Metrics Collector component and ensure " \
+                                "the host has sufficient memory available."
+NIFI_SSL_PROPERTY_REQUIRED_MESSAGE = "If NiFi Certificate Authority is not used and SSL is enabled, must specify {0}"
+NIFI_SSL_REQUIRED_PROPERTIES = ('nifi.security.keystorePasswd', 'nifi.security.keyPasswd', 'nifi.security.truststorePasswd',
+                                'nifi.security.keystoreType', 'nifi.security.truststoreType')
+# Values of the ranger-*-plugin-enabled flags, lower cased, that turn a plugin on
+PLUGIN_ENABLED_VALUES = frozenset(['yes', 'true'])
+# Common spellings of a true boolean property, matched before falling back to lower()
+TRUE_LITERALS = frozenset(['true', 'True', 'TRUE'])
+# ranger-env plugin switches that should only be turned on in a kerberized cluster
+RANGER_ENV_KERBEROS_ONLY_PLUGINS = OrderedDict((("ranger-storm-plugin-enabled", "Ranger Storm plugin should not be enabled in non-kerberos environment."),
+                                                ("ranger-kafka-plugin-enabled", "Ranger Kafka plugin should not be enabled in non-kerberos environment.")))
+
+# (number of shards, replication factor) properties of the service and audit logs collections
+LOGSEARCH_COLLECTION_PROPERTIES = (("logsearch.collection.service.logs.numshards", "logsearch.collection.service.logs.replication.factor"),
+                                   ("logsearch.collection.audit.logs.numshards", "logsearch.collection.audit.logs.replication.factor"))
+
+# (minimum number of sinks, ams-hbase-site properties, ams-site properties) recommended for a single
+# collector, largest clusters first
+# blockCache = 0.3, memstore = 0.3, phoenix-server = 0.2, phoenix-client = 0.3
+AMS_SINKS_COUNT_TIERS = ((2000, {"hbase.regionserver.handler.count": 60,
+                                 "hbase.regionserver.hlog.blocksize": 134217728,
+                                 "hbase.regionserver.maxlogs": 64,
+                                 "hbase.hregion.memstore.flush.size": 268435456,
+                                 "hbase.regionserver.global.memstore.upperLimit": 0.3,
+                                 "hbase.regionserver.global.memstore.lowerLimit": 0.25,
+                                 "phoenix.query.maxGlobalMemoryPercentage": 20,
+                                 "phoenix.coprocessor.maxMetaDataCacheSize": 81920000},
+                                {"phoenix.query.maxGlobalMemoryPercentage": 30,
+                                 "timeline.metrics.service.resultset.fetchSize": 10000}),
+                         (500, {"hbase.regionserver.handler.count": 60,
+                                "hbase.regionserver.hlog.blocksize": 134217728,
+                                "hbase.regionserver.maxlogs": 64,
+                                "hbase.hregion.memstore.flush.size": 268435456,
+                                "phoenix.coprocessor.maxMetaDataCacheSize": 40960000},
+                               {"timeline.metrics.service.resultset.fetchSize": 5000}),
+                         (0, {"phoenix.coprocessor.maxMetaDataCacheSize": 20480000}, {}))
+
+# ambari.properties LDAP settings copied as is into ranger-ugsync-site
+AMBARI_LDAP_TO_RANGER_UGSYNC_PROPERTIES = (("authentication.ldap.baseDn", "ranger.usersync.ldap.searchBase"),
+                                           ("authentication.ldap.groupMembershipAttr", "ranger.usersync.group.memberattributename"),
+                                           ("authentication.ldap.groupNamingAttr", "ranger.usersync.group.nameattribute"),
+                                           ("authentication.ldap.groupObjectClass", "ranger.usersync.group.objectclass"),
+                                           ("authentication.ldap.managerDn", "ranger.usersync.ldap.binddn"),
+                                           ("authentication.ldap.userObjectClass", "ranger.usersync.ldap.user.objectclass"),
+                                           ("authentication.ldap.usernameAttribute", "ranger.usersync.ldap.user.nameattribute"))
+
+class AdvisorRequestContext(object):
+  """
+  Values derived from the services payload of a single stack advisor request,
+  computed once instead of on every recommender/validator call.
+  """
+  def __init__(self, services):
+    self.services = services
+    self.servicesList = []
+    # {(service name, component name): hostnames}
+    self.componentHostnames = {}
+    for service in services["services"]:
+      serviceName = service["StackServices"]["service_name"]
+      self.servicesList.append(serviceName)
+      for component in service.get("components", []):
+        key = (serviceName, component["StackServiceComponents"]["component_name"])
+        if key not in self.componentHostnames:
+          self.componentHostnames[key] = component["StackServiceComponents"]["hostnames"]
+    self.servicesSet = frozenset(self.servicesList)
+    # {host name: [component]}, built on first use
+    self.hostComponents = None
+    # {config type: names of the properties changed by the user}, built on first use
+    self.changedProperties = None
+
+  def isBuiltFrom(self, services):
+    """
+    Whether the context was built from services, or from a shallow copy of it such as the
+    payload of a config group pass, which shares the services and changed-configurations lists.
+    """
+    return services is self.services or \
+           (services["services"] is self.services["services"] and
+            services.get("changed-configurations") is self.services.get("changed-configurations"))
+
+  def getChangedProperties(self, configType):
+    if self.changedProperties is None:
+      self.changedProperties = {}
+      for changedConfig in self.services.get("changed-configurations", []):
+        self.changedProperties.setdefault(changedConfig["type"], set()).add(changedConfig["name"])
+    return self.changedProperties.get(configType, frozenset())
+
+  def getHostComponents(self, hostName):
+    if self.hostComponents is None:
+      self.hostComponents = {}
+      for service in self.services["services"]:
+        for component in service.get("components", []):
+          for componentHostName in set(component["StackServiceComponents"]["hostnames"] or []):
+            self.hostComponents.setdefault(componentHostName, []).append(component)
+    return self.hostComponents.get(hostName, [])
+
 class HDF20StackAdvisor(DefaultStackAdvisor):
 
+  def __init__(self):
+    super(HDF20StackAdvisor, self).__init__()
+    self.requestContext = None
+    # service name -> recommender / {config type: validator}, built on first use
+    self.serviceConfigurationRecommenders = None
+    self.serviceConfigurationValidators = None
+
+  def getRequestContext(self, services):
+    """
+    Returns the AdvisorRequestContext of the stack advisor action being run. Outside of
+    an action (e.g. helpers called directly), or for a services payload the action's
+    context was not built from, a new context is built on every call.
+    """
+    context = self.requestContext
+    if context is not None and context.isBuiltFrom(services):
+      return context
+    return AdvisorRequestContext(services)
+
+  def runWithRequestContext(self, action, services, hosts):
+    """
+    Runs a top level stack advisor action with a context built from its services payload.
+    """
+    previousContext = self.requestContext
+    self.requestContext = AdvisorRequestContext(services) if services is not None else None
+    try:
+      return action(services, hosts)
+    finally:
+      self.requestContext = previousContext
+
+  def recommendComponentLayout(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendComponentLayout, services, hosts)
+
+  def validateComponentLayout(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).validateComponentLayout, services, hosts)
+
+  def recommendConfigurations(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendConfigurations, services, hosts)
+
+  def recommendConfigurationsForSSO(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendConfigurationsForSSO, services, hosts)
+
+  def recommendConfigurationsForLDAP(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendConfigurationsForLDAP, services, hosts)
+
+  def recommendConfigurationsForKerberos(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendConfigurationsForKerberos, services, hosts)
+
+  def recommendConfigurationDependencies(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).recommendConfigurationDependencies, services, hosts)
+
+  def validateConfigurations(self, services, hosts):
+    return self.runWithRequestContext(super(HDF20StackAdvisor, self).validateConfigurations, services, hosts)
+
   def getComponentLayoutValidations(self, services, hosts):
     """Returns array of Validation objects about issues with hostnames components assigned to"""
     items = super(HDF20StackAdvisor, self).getComponentLayoutValidations(services, hosts)
 
-    # Use a set for fast lookup
-    hostsSet =  set(super(HDF20StackAdvisor, self).getActiveHosts([host["Hosts"] for host in hosts["items"]]))  #[host["Hosts"]["host_name"] for host in hosts["items"]]
-    hostsCount = len(hostsSet)
+    # Keyed for fast lookup, ordered so that the validation items come out in the same order on every call
+    activeHosts = OrderedDict.fromkeys(super(HDF20StackAdvisor, self).getActiveHosts([host["Hosts"] for host in hosts["items"]]))
+    hostsCount = len(activeHosts)
 
-    componentsListList = [service["components"] for service in services["services"]]
-    componentsList = [item for sublist in componentsListList for item in sublist]
+    componentsList = list(chain.from_iterable(service["components"] for service in services["services"]))
 
     # Validating cardinality
     for component in componentsList:
@@ -46,7 +253,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
          componentDisplayName = component["StackServiceComponents"]["display_name"]
          componentHosts = []
          if component["StackServiceComponents"]["hostnames"] is not None:
-           componentHosts = [componentHost for componentHost in component["StackServiceComponents"]["hostnames"] if componentHost in hostsSet]
+           componentHosts = [componentHost for componentHost in component["StackServiceComponents"]["hostnames"] if componentHost in activeHosts]
          componentHostsCount = len(componentHosts)
          cardinality = str(component["StackServiceComponents"]["cardinality"])
          # cardinality types: null, 1+, 1-2, 1, ALL
@@ -72,9 +279,9 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
            items.append({"type": 'host-component', "level": 'ERROR', "message": message, "component-name": componentName})
 
     # Validating host-usage
-    usedHostsListList = [component["StackServiceComponents"]["hostnames"] for component in componentsList if not self.isComponentNotValuable(component)]
-    usedHostsList = [item for sublist in usedHostsListList for item in sublist]
-    nonUsedHostsList = [item for item in hostsSet if item not in usedHostsList]
+    usedHostsSet = set(chain.from_iterable(component["StackServiceComponents"]["hostnames"] for component in componentsList
+                                           if not self.isComponentNotValuable(component)))
+    nonUsedHostsList = [item for item in activeHosts if item not in usedHostsSet]
     for host in nonUsedHostsList:
       items.append( { "type": 'host-component', "level": 'ERROR', "message": 'Host is not used', "host": str(host) } )
 
@@ -90,33 +297,60 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       "LOGSEARCH" : self.recommendLogsearchConfigurations
     }
 
+  def getServiceConfigurationRecommender(self, service):
+    if self.serviceConfigurationRecommenders is None:
+      self.serviceConfigurationRecommenders = self.getServiceConfigurationRecommenderDict()
+    return self.serviceConfigurationRecommenders.get(service, None)
+
+  def getHostsByName(self, hosts):
+    """
+    Returns the hosts items of the given hosts payload keyed by host name.
+    """
+    hostsByName = {}
+    for host in hosts["items"]:
+      hostsByName.setdefault(host["Hosts"]["host_name"], host)
+    return hostsByName
+
   def putProperty(self, config, configType, services=None):
     userConfigs = {}
-    changedConfigs = []
+    changedProperties = frozenset()
     # if services parameter, prefer values, set by user
     if services:
-      if 'configurations' in services.keys():
-        userConfigs = services['configurations']
-      if 'changed-configurations' in services.keys():
-        changedConfigs = services["changed-configurations"]
+      userConfigs = services.get('configurations', userConfigs)
+      if services.get('changed-configurations'):
+        changedProperties = self.getRequestContext(services).getChangedProperties(configType)
 
     if configType not in config:
       config[configType] = {}
     if"properties" not in config[configType]:
       config[configType]["properties"] = {}
     def appendProperty(key, value):
-      # If property exists in changedConfigs, do not override, use user defined property
-      if self.__isPropertyInChangedConfigs(configType, key, changedConfigs):
+      # If property exists in changed configurations, do not override, use user defined property
+      if key in changedProperties:
         config[configType]["properties"][key] = userConfigs[configType]['properties'][key]
       else:
         config[configType]["properties"][key] = str(value)
     return appendProperty
 
-  def __isPropertyInChangedConfigs(self, configType, propertyName, changedConfigs):
-    for changedConfig in changedConfigs:
-      if changedConfig['type']==configType and changedConfig['name']==propertyName:
-        return True
-    return False
+  def putProperties(self, config, configType, properties, services=None):
+    """
+    Bulk version of putProperty, puts all the properties of the given dict into configType.
+    """
+    userConfigs = {}
+    changedProperties = frozenset()
+    # if services parameter, prefer values, set by user
+    if services:
+      userConfigs = services.get('configurations', userConfigs)
+      if services.get('changed-configurations'):
+        changedProperties = self.getRequestContext(services).getChangedProperties(configType)
+
+    configProperties = config.setdefault(configType, {}).setdefault("properties", {})
+    for key, value in properties.iteritems():
+      # If property exists in changed configurations, do not override, use user defined property
+      if key in changedProperties:
+        configProperties[key] = userConfigs[configType]['properties'][key]
+      else:
+        configProperties[key] = str(value)
 
   def putPropertyAttribute(self, config, configType):
     if configType not in config:
@@ -137,20 +371,20 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
                         and 'SASL' in kafka_broker['security.inter.broker.protocol'])
     putKafkaBrokerProperty = self.putProperty(configurations, "kafka-broker", services)
     putKafkaLog4jProperty = self.putProperty(configurations, "kafka-log4j", services)
-    putKafkaBrokerAttributes = self.putPropertyAttribute(configurations, "kafka-broker")
+    servicesConfigurations = services['configurations']
 
     #If AMS is part of Services, use the KafkaTimelineMetricsReporter for metric reporting. Default is ''.
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if "AMBARI_METRICS" in servicesList:
+    servicesSet = self.getRequestContext(services).servicesSet
+    if "AMBARI_METRICS" in servicesSet:
       putKafkaBrokerProperty('kafka.metrics.reporters', 'org.apache.hadoop.metrics2.sink.kafka.KafkaTimelineMetricsReporter')
 
-    if "ranger-env" in services["configurations"] and "ranger-kafka-plugin-properties" in services["configurations"] and \
-            "ranger-kafka-plugin-enabled" in services["configurations"]["ranger-env"]["properties"]:
+    if "ranger-env" in servicesConfigurations and "ranger-kafka-plugin-properties" in servicesConfigurations and \
+            "ranger-kafka-plugin-enabled" in servicesConfigurations["ranger-env"]["properties"]:
       putKafkaRangerPluginProperty = self.putProperty(configurations, "ranger-kafka-plugin-properties", services)
-      rangerEnvKafkaPluginProperty = services["configurations"]["ranger-env"]["properties"]["ranger-kafka-plugin-enabled"]
+      rangerEnvKafkaPluginProperty = servicesConfigurations["ranger-env"]["properties"]["ranger-kafka-plugin-enabled"]
       putKafkaRangerPluginProperty("ranger-kafka-plugin-enabled", rangerEnvKafkaPluginProperty)
 
-    if 'ranger-kafka-plugin-properties' in services['configurations'] and ('ranger-kafka-plugin-enabled' in services['configurations']['ranger-kafka-plugin-properties']['properties']):
+    if 'ranger-kafka-plugin-properties' in servicesConfigurations and ('ranger-kafka-plugin-enabled' in servicesConfigurations['ranger-kafka-plugin-properties']['properties']):
       kafkaLog4jRangerLines = [{
         "name": "log4j.appender.rangerAppender",
         "value": "org.apache.log4j.DailyRollingFileAppender"
@@ -176,36 +410,35 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
           "value": "INFO, rangerAppender"
         }]
 
-      rangerPluginEnabled=''
-      if 'ranger-kafka-plugin-properties' in configurations and 'ranger-kafka-plugin-enabled' in  configurations['ranger-kafka-plugin-properties']['properties']:
-        rangerPluginEnabled = configurations['ranger-kafka-plugin-properties']['properties']['ranger-kafka-plugin-enabled']
-      elif 'ranger-kafka-plugin-properties' in services['configurations'] and 'ranger-kafka-plugin-enabled' in services['configurations']['ranger-kafka-plugin-properties']['properties']:
-        rangerPluginEnabled = services['configurations']['ranger-kafka-plugin-properties']['properties']['ranger-kafka-plugin-enabled']
+      rangerPluginEnabled = getRecommendedOrServicesProperty(configurations, services, 'ranger-kafka-plugin-properties', 'ranger-kafka-plugin-enabled', '')
 
-      if  rangerPluginEnabled and rangerPluginEnabled.lower() == "Yes".lower():
+      if rangerPluginEnabled and rangerPluginEnabled.lower() in PLUGIN_ENABLED_VALUES:
         # recommend authorizer.class.name
         putKafkaBrokerProperty("authorizer.class.name", 'org.apache.ranger.authorization.kafka.authorizer.RangerKafkaAuthorizer')
         # change kafka-log4j when ranger plugin is installed
 
-        if 'kafka-log4j' in services['configurations'] and 'content' in services['configurations']['kafka-log4j']['properties']:
-          kafkaLog4jContent = services['configurations']['kafka-log4j']['properties']['content']
-          for item in range(len(kafkaLog4jRangerLines)):
-            if kafkaLog4jRangerLines[item]["name"] not in kafkaLog4jContent:
-              kafkaLog4jContent+= '\n' + kafkaLog4jRangerLines[item]["name"] + '=' + kafkaLog4jRangerLines[item]["value"]
-          putKafkaLog4jProperty("content",kafkaLog4jContent)
+        if 'kafka-log4j' in servicesConfigurations and 'content' in servicesConfigurations['kafka-log4j']['properties']:
+          kafkaLog4jContent = servicesConfigurations['kafka-log4j']['properties']['content']
+          # none of the names is contained in another's line, so checking the original content is enough
+          missingLines = [kafkaLog4jRangerLine["name"] + '=' + kafkaLog4jRangerLine["value"]
+                          for kafkaLog4jRangerLine in kafkaLog4jRangerLines
+                          if kafkaLog4jRangerLine["name"] not in kafkaLog4jContent]
+          putKafkaLog4jProperty("content", '\n'.join([kafkaLog4jContent] + missingLines))
 
 
       else:
         # Kerberized Cluster with Ranger plugin disabled
-        if security_enabled and 'kafka-broker' in services['configurations'] and 'authorizer.class.name' in services['configurations']['kafka-broker']['properties'] and \
-                services['configurations']['kafka-broker']['properties']['authorizer.class.name'] == 'org.apache.ranger.authorization.kafka.authorizer.RangerKafkaAuthorizer':
+        if security_enabled and 'kafka-broker' in servicesConfigurations and 'authorizer.class.name' in servicesConfigurations['kafka-broker']['properties'] and \
+                servicesConfigurations['kafka-broker']['properties']['authorizer.class.name'] == 'org.apache.ranger.authorization.kafka.authorizer.RangerKafkaAuthorizer':
           putKafkaBrokerProperty("authorizer.class.name", 'kafka.security.auth.SimpleAclAuthorizer')
         # Non-kerberos Cluster with Ranger plugin disabled
         else:
+          putKafkaBrokerAttributes = self.putPropertyAttribute(configurations, "kafka-broker")
           putKafkaBrokerAttributes('authorizer.class.name', 'delete', 'true')
 
     # Non-Kerberos Cluster without Ranger
     elif not security_enabled:
+      putKafkaBrokerAttributes = self.putPropertyAttribute(configurations, "kafka-broker")
       putKafkaBrokerAttributes('authorizer.class.name', 'delete', 'true')
 
   def getOracleDBConnectionHostPort(self, db_type, db_host, rangerDbName):
@@ -225,7 +458,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     else:
       colon_count = db_host.count(':')
       if colon_count == 0:
-        if DB_TYPE_DEFAULT_PORT_MAP.has_key(db_type):
+        if db_type in DB_TYPE_DEFAULT_PORT_MAP:
           connection_string = db_host + ":" + DB_TYPE_DEFAULT_PORT_MAP[db_type]
         else:
           connection_string = db_host
@@ -238,26 +471,28 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
 
   def recommendNIFIConfigurations(self, configurations, clusterData, services, hosts):
     nifi = getServicesSiteProperties(services, "nifi")
+    servicesConfigurations = services["configurations"]
 
-    if "ranger-env" in services["configurations"] and "ranger-nifi-plugin-properties" in services["configurations"] and \
-                    "ranger-nifi-plugin-enabled" in services["configurations"]["ranger-env"]["properties"]:
+    if "ranger-env" in servicesConfigurations and "ranger-nifi-plugin-properties" in servicesConfigurations and \
+                    "ranger-nifi-plugin-enabled" in servicesConfigurations["ranger-env"]["properties"]:
       putNiFiRangerPluginProperty = self.putProperty(configurations, "ranger-nifi-plugin-properties", services)
-      rangerEnvNiFiPluginProperty = services["configurations"]["ranger-env"]["properties"]["ranger-nifi-plugin-enabled"]
+      rangerEnvNiFiPluginProperty = servicesConfigurations["ranger-env"]["properties"]["ranger-nifi-plugin-enabled"]
       putNiFiRangerPluginProperty("ranger-nifi-plugin-enabled", rangerEnvNiFiPluginProperty)
 
-      if rangerEnvNiFiPluginProperty == 'Yes' and \
-                      "nifi.authentication" in services["configurations"]["ranger-nifi-plugin-properties"]["properties"] and \
-                      "nifi.node.ssl.isenabled" in services["configurations"]["nifi-ambari-ssl-config"]["properties"]:
-        nifiAmbariSSLConfig = 'SSL' if services["configurations"]["nifi-ambari-ssl-config"]["properties"]["nifi.node.ssl.isenabled"] == 'true' else 'NONE'
+      if (rangerEnvNiFiPluginProperty or '').lower() in PLUGIN_ENABLED_VALUES and \
+                      "nifi.authentication" in servicesConfigurations["ranger-nifi-plugin-properties"]["properties"] and \
+                      "nifi.node.ssl.isenabled" in servicesConfigurations["nifi-ambari-ssl-config"]["properties"]:
+        nifiAmbariSSLConfig = 'SSL' if servicesConfigurations["nifi-ambari-ssl-config"]["properties"]["nifi.node.ssl.isenabled"] == 'true' else 'NONE'
         putNiFiRangerPluginProperty("nifi.authentication",nifiAmbariSSLConfig)
 
   def recommendRangerConfigurations(self, configurations, clusterData, services, hosts):
 
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
+    servicesSet = self.getRequestContext(services).servicesSet
     putRangerEnvProperty = self.putProperty(configurations, "ranger-env", services)
     putRangerAdminProperty = self.putProperty(configurations, "admin-properties", services)
     putRangerAdminSiteProperty = self.putProperty(configurations, "ranger-admin-site", services)
-    putRangerUgsyncSite = self.putProperty(configurations, "ranger-ugsync-site", services)
+    # ranger-ugsync-site is always part of the recommendation, even when no ldap settings are copied into it
+    configurations.setdefault("ranger-ugsync-site", {}).setdefault("properties", {})
     putTagsyncAppProperty = self.putProperty(configurations, "tagsync-application-properties", services)
     putTagsyncSiteProperty = self.putProperty(configurations, "ranger-tagsync-site", services)
 
@@ -269,105 +504,61 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     ranger_admin_host = 'localhost'
     port = '6080'
 
+    rangerAdminSite = getServicesSiteProperties(services, "ranger-admin-site") or {}
+    adminProperties = getServicesSiteProperties(services, "admin-properties") or {}
+
     # Check if http is disabled. For HDF this can be checked in ranger-admin-site/ranger.service.http.enabled
-    if ('ranger-admin-site' in services['configurations'] and 'ranger.service.http.enabled' in services['configurations']['ranger-admin-site']['properties'] \
-      and services['configurations']['ranger-admin-site']['properties']['ranger.service.http.enabled'].lower() == 'false'):
+    if rangerAdminSite.get('ranger.service.http.enabled', '').lower() == 'false':
       # HTTPS protocol is used
       protocol = 'https'
-      if 'ranger-admin-site' in services['configurations'] and \
-          'ranger.service.https.port' in services['configurations']['ranger-admin-site']['properties']:
-        port = services['configurations']['ranger-admin-site']['properties']['ranger.service.https.port']
+      port = rangerAdminSite.get('ranger.service.https.port', port)
     else:
       # HTTP protocol is used
-      if 'ranger-admin-site' in services['configurations'] and \
-          'ranger.service.http.port' in services['configurations']['ranger-admin-site']['properties']:
-        port = services['configurations']['ranger-admin-site']['properties']['ranger.service.http.port']
+      port = rangerAdminSite.get('ranger.service.http.port', port)
 
     ranger_admin_hosts = self.getComponentHostNames(services, "RANGER", "RANGER_ADMIN")
     if ranger_admin_hosts:
-      if len(ranger_admin_hosts) > 1 \
-        and services['configurations'] \
-        and 'admin-properties' in services['configurations'] and 'policymgr_external_url' in services['configurations']['admin-properties']['properties'] \
-        and services['configurations']['admin-properties']['properties']['policymgr_external_url'] \
-        and services['configurations']['admin-properties']['properties']['policymgr_external_url'].strip():
-
-        # in case of HA deployment keep the policymgr_external_url specified in the config
-        policymgr_external_url = services['configurations']['admin-properties']['properties']['policymgr_external_url']
-      else:
+      # in case of HA deployment keep the policymgr_external_url specified in the config
+      policymgr_external_url = adminProperties.get('policymgr_external_url')
+      if len(ranger_admin_hosts) == 1 or not policymgr_external_url or not policymgr_external_url.strip():
         ranger_admin_host = ranger_admin_hosts[0]
         policymgr_external_url = "{0}://{1}:{2}".format(protocol, ranger_admin_host, port)
 
       putRangerAdminProperty('policymgr_external_url', policymgr_external_url)
 
     cluster_env = getServicesSiteProperties(services, "cluster-env")
-    security_enabled = cluster_env is not None and "security_enabled" in cluster_env and \
-                       cluster_env["security_enabled"].lower() == "true"
+    security_enabled = cluster_env is not None and cluster_env.get("security_enabled", "").lower() == "true"
     if "ranger-env" in configurations and not security_enabled:
       putRangerEnvProperty("ranger-storm-plugin-enabled", "No")
 
-    if 'admin-properties' in services['configurations'] and ('DB_FLAVOR' in services['configurations']['admin-properties']['properties']) \
-        and ('db_host' in services['configurations']['admin-properties']['properties']) and ('db_name' in services['configurations']['admin-properties']['properties']):
-
-      rangerDbFlavor = services['configurations']["admin-properties"]["properties"]["DB_FLAVOR"]
-      rangerDbHost =   services['configurations']["admin-properties"]["properties"]["db_host"]
-      rangerDbName =   services['configurations']["admin-properties"]["properties"]["db_name"]
-      ranger_db_url_dict = {
-        'MYSQL': {'ranger.jpa.jdbc.driver': 'com.mysql.jdbc.Driver',
-                  'ranger.jpa.jdbc.url': 'jdbc:mysql://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + '/' + rangerDbName},
-        'ORACLE': {'ranger.jpa.jdbc.driver': 'oracle.jdbc.driver.OracleDriver',
-                   'ranger.jpa.jdbc.url': 'jdbc:oracle:thin:@//' + self.getOracleDBConnectionHostPort(rangerDbFlavor, rangerDbHost, rangerDbName)},
-        'POSTGRES': {'ranger.jpa.jdbc.driver': 'org.postgresql.Driver',
-                     'ranger.jpa.jdbc.url': 'jdbc:postgresql://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + '/' + rangerDbName},
-        'MSSQL': {'ranger.jpa.jdbc.driver': 'com.microsoft.sqlserver.jdbc.SQLServerDriver',
-                  'ranger.jpa.jdbc.url': 'jdbc:sqlserver://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + ';databaseName=' + rangerDbName},
-        'SQLA': {'ranger.jpa.jdbc.driver': 'sap.jdbc4.sqlanywhere.IDriver',
-                 'ranger.jpa.jdbc.url': 'jdbc:sqlanywhere:host=' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + ';database=' + rangerDbName}
-      }
-      rangerDbProperties = ranger_db_url_dict.get(rangerDbFlavor, ranger_db_url_dict['MYSQL'])
-      for key in rangerDbProperties:
-        putRangerAdminSiteProperty(key, rangerDbProperties.get(key))
-
-      if 'admin-properties' in services['configurations'] and ('DB_FLAVOR' in services['configurations']['admin-properties']['properties']) \
-          and ('db_host' in services['configurations']['admin-properties']['properties']):
-
-        rangerDbFlavor = services['configurations']["admin-properties"]["properties"]["DB_FLAVOR"]
-        rangerDbHost =   services['configurations']["admin-properties"]["properties"]["db_host"]
-        ranger_db_privelege_url_dict = {
-          'MYSQL': {'ranger_privelege_user_jdbc_url': 'jdbc:mysql://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost)},
-          'ORACLE': {'ranger_privelege_user_jdbc_url': 'jdbc:oracle:thin:@//' + self.getOracleDBConnectionHostPort(rangerDbFlavor, rangerDbHost, None)},
-          'POSTGRES': {'ranger_privelege_user_jdbc_url': 'jdbc:postgresql://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + '/postgres'},
-          'MSSQL': {'ranger_privelege_user_jdbc_url': 'jdbc:sqlserver://' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + ';'},
-          'SQLA': {'ranger_privelege_user_jdbc_url': 'jdbc:sqlanywhere:host=' + self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost) + ';'}
-        }
-        rangerPrivelegeDbProperties = ranger_db_privelege_url_dict.get(rangerDbFlavor, ranger_db_privelege_url_dict['MYSQL'])
-        for key in rangerPrivelegeDbProperties:
-          putRangerEnvProperty(key, rangerPrivelegeDbProperties.get(key))
+    if 'DB_FLAVOR' in adminProperties and 'db_host' in adminProperties and 'db_name' in adminProperties:
+
+      rangerDbFlavor = adminProperties["DB_FLAVOR"]
+      rangerDbHost =   adminProperties["db_host"]
+      rangerDbName =   adminProperties["db_name"]
+      if rangerDbFlavor == 'ORACLE':
+        rangerDbHostPort = self.getOracleDBConnectionHostPort(rangerDbFlavor, rangerDbHost, rangerDbName)
+        rangerPrivelegeDbHostPort = self.getOracleDBConnectionHostPort(rangerDbFlavor, rangerDbHost, None)
+      else:
+        rangerDbHostPort = rangerPrivelegeDbHostPort = self.getDBConnectionHostPort(rangerDbFlavor, rangerDbHost)
+      rangerDbDriver, rangerDbUrl, rangerPrivelegeDbUrl = RANGER_DB_PROPERTIES.get(rangerDbFlavor, RANGER_DB_PROPERTIES['MYSQL'])
+      self.putProperties(configurations, "ranger-admin-site", {'ranger.jpa.jdbc.driver': rangerDbDriver,
+                                                               'ranger.jpa.jdbc.url': rangerDbUrl.format(rangerDbHostPort, rangerDbName)}, services)
+      putRangerEnvProperty('ranger_privelege_user_jdbc_url', rangerPrivelegeDbUrl.format(rangerPrivelegeDbHostPort))
 
     # Recommend ldap settings based on ambari.properties configuration
-    if 'ambari-server-properties' in services and \
-            'ambari.ldap.isConfigured' in services['ambari-server-properties'] and \
-            services['ambari-server-properties']['ambari.ldap.isConfigured'].lower() == "true":
-      serverProperties = services['ambari-server-properties']
-      if 'authentication.ldap.baseDn' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.ldap.searchBase', serverProperties['authentication.ldap.baseDn'])
-      if 'authentication.ldap.groupMembershipAttr' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.group.memberattributename', serverProperties['authentication.ldap.groupMembershipAttr'])
-      if 'authentication.ldap.groupNamingAttr' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.group.nameattribute', serverProperties['authentication.ldap.groupNamingAttr'])
-      if 'authentication.ldap.groupObjectClass' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.group.objectclass', serverProperties['authentication.ldap.groupObjectClass'])
-      if 'authentication.ldap.managerDn' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.ldap.binddn', serverProperties['authentication.ldap.managerDn'])
+    serverProperties = services.get('ambari-server-properties', {})
+    if serverProperties.get('ambari.ldap.isConfigured', '').lower() == "true":
+      ugsyncLdapProperties = dict((ugsyncProperty, serverProperties[ambariProperty])
+                                  for ambariProperty, ugsyncProperty in AMBARI_LDAP_TO_RANGER_UGSYNC_PROPERTIES
+                                  if ambariProperty in serverProperties)
       if 'authentication.ldap.primaryUrl' in serverProperties:
         ldap_protocol =  'ldap://'
-        if 'authentication.ldap.useSSL' in serverProperties and serverProperties['authentication.ldap.useSSL'] == 'true':
+        if serverProperties.get('authentication.ldap.useSSL') == 'true':
           ldap_protocol =  'ldaps://'
         ldapUrl = ldap_protocol + serverProperties['authentication.ldap.primaryUrl'] if serverProperties['authentication.ldap.primaryUrl'] else serverProperties['authentication.ldap.primaryUrl']
-        putRangerUgsyncSite('ranger.usersync.ldap.url', ldapUrl)
-      if 'authentication.ldap.userObjectClass' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.ldap.user.objectclass', serverProperties['authentication.ldap.userObjectClass'])
-      if 'authentication.ldap.usernameAttribute' in serverProperties:
-        putRangerUgsyncSite('ranger.usersync.ldap.user.nameattribute', serverProperties['authentication.ldap.usernameAttribute'])
+        ugsyncLdapProperties['ranger.usersync.ldap.url'] = ldapUrl
+      self.putProperties(configurations, "ranger-ugsync-site", ugsyncLdapProperties, services)
 
 
     # Recommend Ranger Authentication method
@@ -376,105 +567,63 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       'org.apache.ranger.ldapusersync.process.LdapUserGroupBuilder': 'LDAP'
     }
 
-    if 'ranger-ugsync-site' in services['configurations'] and 'ranger.usersync.source.impl.class' in services['configurations']["ranger-ugsync-site"]["properties"]:
-      rangerUserSyncClass = services['configurations']["ranger-ugsync-site"]["properties"]["ranger.usersync.source.impl.class"]
-      if rangerUserSyncClass in authMap:
-        rangerAuthMethod = authMap.get(rangerUserSyncClass)
-        putRangerAdminSiteProperty('ranger.authentication.method', rangerAuthMethod)
+    rangerUgsyncSite = getServicesSiteProperties(services, "ranger-ugsync-site") or {}
+    rangerUserSyncClass = rangerUgsyncSite.get("ranger.usersync.source.impl.class")
+    if rangerUserSyncClass in authMap:
+      putRangerAdminSiteProperty('ranger.authentication.method', authMap[rangerUserSyncClass])
 
     # Recommend Ambari Infra Solr properties
-    is_solr_cloud_enabled = False
-    if 'ranger-env' in services['configurations'] and 'is_solrCloud_enabled' in services['configurations']["ranger-env"]["properties"]:
-      is_solr_cloud_enabled = services['configurations']["ranger-env"]["properties"]["is_solrCloud_enabled"]  == "true"
-
-    is_external_solr_cloud_enabled = False
-    if 'ranger-env' in services['configurations'] and 'is_external_solrCloud_enabled' in services['configurations']['ranger-env']['properties']:
-      is_external_solr_cloud_enabled = services['configurations']['ranger-env']['properties']['is_external_solrCloud_enabled']  == 'true'
-
-    ranger_audit_zk_port = ''
-
-
-    if 'AMBARI_INFRA' in servicesList and zookeeper_host_port and is_solr_cloud_enabled and not is_external_solr_cloud_enabled:
-      zookeeper_host_port = zookeeper_host_port.split(',')
-      zookeeper_host_port.sort()
-      zookeeper_host_port = ",".join(zookeeper_host_port)
-      infra_solr_znode = '/infra-solr'
-
-      if 'infra-solr-env' in services['configurations'] and \
-        ('infra_solr_znode' in services['configurations']['infra-solr-env']['properties']):
-        infra_solr_znode = services['configurations']['infra-solr-env']['properties']['infra_solr_znode']
-        ranger_audit_zk_port = '{0}{1}'.format(zookeeper_host_port, infra_solr_znode)
+    rangerEnv = getServicesSiteProperties(services, "ranger-env") or {}
+    is_solr_cloud_enabled = rangerEnv.get("is_solrCloud_enabled") == "true"
+    is_external_solr_cloud_enabled = rangerEnv.get("is_external_solrCloud_enabled") == "true"
+
+    if 'AMBARI_INFRA' in servicesSet and zookeeper_host_port and is_solr_cloud_enabled and not is_external_solr_cloud_enabled:
+      zookeeper_host_port = self.getSortedZKHostPortString(services)
+      infraSolrEnv = getServicesSiteProperties(services, 'infra-solr-env') or {}
+      ranger_audit_zk_port = zookeeper_host_port + infraSolrEnv['infra_solr_znode'] if 'infra_solr_znode' in infraSolrEnv else ''
       putRangerAdminSiteProperty('ranger.audit.solr.zookeepers', ranger_audit_zk_port)
     elif zookeeper_host_port and is_solr_cloud_enabled and is_external_solr_cloud_enabled:
-      ranger_audit_zk_port = '{0}/{1}'.format(zookeeper_host_port, 'ranger_audits')
+      ranger_audit_zk_port = zookeeper_host_port + '/ranger_audits'
       putRangerAdminSiteProperty('ranger.audit.solr.zookeepers', ranger_audit_zk_port)
     else:
       putRangerAdminSiteProperty('ranger.audit.solr.zookeepers', 'NONE')
 
-    # Recommend Ranger supported service's audit properties
-    ranger_services = [
-      {'service_name': 'KAFKA', 'audit_file': 'ranger-kafka-audit'},
-      {'service_name': 'STORM', 'audit_file': 'ranger-storm-audit'},
-      {'service_name': 'NIFI', 'audit_file': 'ranger-nifi-audit'}
-    ]
+    # Recommend Ranger supported service's audit properties, they are the same for every service
+    rangerAuditProperties = {}
+    for audit_map in RANGER_AUDIT_PROPERTIES:
+      if audit_map['configname'] in (getServicesSiteProperties(services, audit_map['filename']) or {}):
+        rangerAuditProperties[audit_map['target_configname']] = getRecommendedOrServicesProperty(
+          configurations, services, audit_map['filename'], audit_map['configname'])
 
-    for item in range(len(ranger_services)):
-      if ranger_services[item]['service_name'] in servicesList:
-        component_audit_file =  ranger_services[item]['audit_file']
+    for ranger_service in RANGER_SERVICES:
+      if ranger_service['service_name'] in servicesSet:
+        component_audit_file = ranger_service['audit_file']
         if component_audit_file in services["configurations"]:
-          ranger_audit_dict = [
-            {'filename': 'ranger-env', 'configname': 'xasecure.audit.destination.solr', 'target_configname': 'xasecure.audit.destination.solr'},
-            {'filename': 'ranger-admin-site', 'configname': 'ranger.audit.solr.urls', 'target_configname': 'xasecure.audit.destination.solr.urls'},
-            {'filename': 'ranger-admin-site', 'configname': 'ranger.audit.solr.zookeepers', 'target_configname': 'xasecure.audit.destination.solr.zookeepers'}
-          ]
-          putRangerAuditProperty = self.putProperty(configurations, component_audit_file, services)
-
-          for item in ranger_audit_dict:
-            if item['filename'] in services["configurations"] and item['configname'] in  services["configurations"][item['filename']]["properties"]:
-              if item['filename'] in configurations and item['configname'] in  configurations[item['filename']]["properties"]:
-                rangerAuditProperty = configurations[item['filename']]["properties"][item['configname']]
-              else:
-                rangerAuditProperty = services["configurations"][item['filename']]["properties"][item['configname']]
-              putRangerAuditProperty(item['target_configname'], rangerAuditProperty)
-
-    ranger_plugins_serviceuser = [
-      {'service_name': 'STORM', 'file_name': 'storm-env', 'config_name': 'storm_user', 'target_configname': 'ranger.plugins.storm.serviceuser'},
-      {'service_name': 'KAFKA', 'file_name': 'kafka-env', 'config_name': 'kafka_user', 'target_configname': 'ranger.plugins.kafka.serviceuser'},
-      {'service_name': 'NIFI', 'file_name': 'nifi-env', 'config_name': 'nifi_user', 'target_configname': 'ranger.plugins.nifi.serviceuser'}
-    ]
-
-    for item in range(len(ranger_plugins_serviceuser)):
-      if ranger_plugins_serviceuser[item]['service_name'] in servicesList:
-        file_name = ranger_plugins_serviceuser[item]['file_name']
-        config_name = ranger_plugins_serviceuser[item]['config_name']
-        target_configname = ranger_plugins_serviceuser[item]['target_configname']
-        if file_name in services["configurations"] and config_name in services["configurations"][file_name]["properties"]:
-          service_user = services["configurations"][file_name]["properties"][config_name]
-          putRangerAdminSiteProperty(target_configname, service_user)
+          self.putProperties(configurations, component_audit_file, rangerAuditProperties, services)
+
+        serviceEnv = getServicesSiteProperties(services, ranger_service['file_name']) or {}
+        if ranger_service['config_name'] in serviceEnv:
+          putRangerAdminSiteProperty(ranger_service['target_configname'], serviceEnv[ranger_service['config_name']])
 
 
     has_ranger_tagsync = False
-    if 'RANGER' in servicesList:
+    if 'RANGER' in servicesSet:
       ranger_tagsync_host = self.getComponentHostNames(services, "RANGER", "RANGER_TAGSYNC")
-      has_ranger_tagsync = len(ranger_tagsync_host) > 0
+      has_ranger_tagsync = bool(ranger_tagsync_host)
 
-    if 'ATLAS' in servicesList and has_ranger_tagsync:
+    if 'ATLAS' in servicesSet and has_ranger_tagsync:
       putTagsyncSiteProperty('ranger.tagsync.source.atlas', 'true')
 
     if zookeeper_host_port and has_ranger_tagsync:
       putTagsyncAppProperty('atlas.kafka.zookeeper.connect', zookeeper_host_port)
 
-    if 'KAFKA' in servicesList and has_ranger_tagsync:
+    if 'KAFKA' in servicesSet and has_ranger_tagsync:
       kafka_hosts = self.getHostNamesWithComponent("KAFKA", "KAFKA_BROKER", services)
       kafka_port = '6667'
       if 'kafka-broker' in services['configurations'] and (
             'port' in services['configurations']['kafka-broker']['properties']):
         kafka_port = services['configurations']['kafka-broker']['properties']['port']
-      kafka_host_port = []
-      for i in range(len(kafka_hosts)):
-        kafka_host_port.append(kafka_hosts[i] + ':' + kafka_port)
-
-      final_kafka_host = ",".join(kafka_host_port)
+      final_kafka_host = ",".join(kafka_host + ':' + kafka_port for kafka_host in kafka_hosts)
       putTagsyncAppProperty('atlas.kafka.bootstrap.servers', final_kafka_host)
 
   def getAmsMemoryRecommendation(self, services, hosts):
@@ -497,45 +646,40 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     total_sinks_count = 0
     # minimum heap size
     hbase_heapsize = 500
-    for serviceName, componentsDict in schMemoryMap.items():
-      for componentName, multiplier in componentsDict.items():
+    for serviceName, componentsDict in schMemoryMap.iteritems():
+      for componentName, multiplier in componentsDict.iteritems():
         schCount = len(
           self.getHostsWithComponent(serviceName, componentName, services,
                                      hosts))
         hbase_heapsize += int((schCount * multiplier) ** 0.9)
         total_sinks_count += schCount
-    collector_heapsize = int(hbase_heapsize/4 if hbase_heapsize > 2048 else 512)
+    collector_heapsize = hbase_heapsize // 4 if hbase_heapsize > 2048 else 512
 
     return round_to_n(collector_heapsize), round_to_n(hbase_heapsize), total_sinks_count
 
   def recommendStormConfigurations(self, configurations, clusterData, services, hosts):
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
+    servicesSet = self.getRequestContext(services).servicesSet
     putStormSiteProperty = self.putProperty(configurations, "storm-site", services)
-    putStormStartupProperty = self.putProperty(configurations, "storm-site", services)
-    putStormSiteAttributes = self.putPropertyAttribute(configurations, "storm-site")
 
     # Storm AMS integration
-    if 'AMBARI_METRICS' in servicesList:
+    if 'AMBARI_METRICS' in servicesSet:
       putStormSiteProperty('metrics.reporter.register', 'org.apache.hadoop.metrics2.sink.storm.StormTimelineMetricsReporter')
 
+    servicesConfigurations = services["configurations"]
     storm_site = getServicesSiteProperties(services, "storm-site")
     security_enabled = (storm_site is not None and "storm.zookeeper.superACL" in storm_site)
-    if "ranger-env" in services["configurations"] and "ranger-storm-plugin-properties" in services["configurations"] and \
-            "ranger-storm-plugin-enabled" in services["configurations"]["ranger-env"]["properties"]:
+    if "ranger-env" in servicesConfigurations and "ranger-storm-plugin-properties" in servicesConfigurations and \
+            "ranger-storm-plugin-enabled" in servicesConfigurations["ranger-env"]["properties"]:
       putStormRangerPluginProperty = self.putProperty(configurations, "ranger-storm-plugin-properties", services)
-      rangerEnvStormPluginProperty = services["configurations"]["ranger-env"]["properties"]["ranger-storm-plugin-enabled"]
+      rangerEnvStormPluginProperty = servicesConfigurations["ranger-env"]["properties"]["ranger-storm-plugin-enabled"]
       putStormRangerPluginProperty("ranger-storm-plugin-enabled", rangerEnvStormPluginProperty)
 
-    rangerPluginEnabled = ''
-    if 'ranger-storm-plugin-properties' in configurations and 'ranger-storm-plugin-enabled' in  configurations['ranger-storm-plugin-properties']['properties']:
-      rangerPluginEnabled = configurations['ranger-storm-plugin-properties']['properties']['ranger-storm-plugin-enabled']
-    elif 'ranger-storm-plugin-properties' in services['configurations'] and 'ranger-storm-plugin-enabled' in services['configurations']['ranger-storm-plugin-properties']['properties']:
-      rangerPluginEnabled = services['configurations']['ranger-storm-plugin-properties']['properties']['ranger-storm-plugin-enabled']
+    rangerPluginEnabled = getRecommendedOrServicesProperty(configurations, services, 'ranger-storm-plugin-properties', 'ranger-storm-plugin-enabled', '')
 
     nonRangerClass = 'backtype.storm.security.auth.authorizer.SimpleACLAuthorizer'
     rangerServiceVersion=''
-    if 'RANGER' in servicesList:
-      rangerServiceVersion = [service['StackServices']['service_version'] for service in services["services"] if service['StackServices']['service_name'] == 'RANGER'][0]
+    if 'RANGER' in servicesSet:
+      rangerServiceVersion = next(service['StackServices']['service_version'] for service in services["services"] if service['StackServices']['service_name'] == 'RANGER')
 
     if rangerServiceVersion and rangerServiceVersion == '0.4.0':
       rangerClass = 'com.xasecure.authorization.storm.authorizer.XaSecureStormAuthorizer'
@@ -543,24 +687,22 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       rangerClass = 'org.apache.ranger.authorization.storm.authorizer.RangerStormAuthorizer'
     # Cluster is kerberized
     if security_enabled:
-      if rangerPluginEnabled and (rangerPluginEnabled.lower() == 'Yes'.lower()):
+      if rangerPluginEnabled and rangerPluginEnabled.lower() in PLUGIN_ENABLED_VALUES:
         putStormSiteProperty('nimbus.authorizer',rangerClass)
-      elif (services["configurations"]["storm-site"]["properties"]["nimbus.authorizer"] == rangerClass):
+      elif storm_site["nimbus.authorizer"] == rangerClass:
         putStormSiteProperty('nimbus.authorizer', nonRangerClass)
     else:
+      putStormSiteAttributes = self.putPropertyAttribute(configurations, "storm-site")
       putStormSiteAttributes('nimbus.authorizer', 'delete', 'true')
 
-    if "storm-site" in services["configurations"]:
+    if storm_site is not None:
       # atlas
       notifier_plugin_property = "storm.topology.submission.notifier.plugin.class"
-      if notifier_plugin_property in services["configurations"]["storm-site"]["properties"]:
-        notifier_plugin_value = services["configurations"]["storm-site"]["properties"][notifier_plugin_property]
-        if notifier_plugin_value is None:
-          notifier_plugin_value = " "
-      else:
+      notifier_plugin_value = storm_site.get(notifier_plugin_property)
+      if notifier_plugin_value is None:
         notifier_plugin_value = " "
 
-      include_atlas = "ATLAS" in servicesList
+      include_atlas = "ATLAS" in servicesSet
       atlas_hook_class = "org.apache.atlas.storm.hook.StormAtlasHook"
       if include_atlas and atlas_hook_class not in notifier_plugin_value:
         if notifier_plugin_value == " ":
@@ -577,7 +719,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
         else:
           notifier_plugin_value = " "
       if notifier_plugin_value != " ":
-        putStormStartupProperty(notifier_plugin_property, notifier_plugin_value)
+        putStormSiteProperty(notifier_plugin_property, notifier_plugin_value)
 
   def recommendAmsConfigurations(self, configurations, clusterData, services, hosts):
     putAmsEnvProperty = self.putProperty(configurations, "ams-env", services)
@@ -585,56 +727,39 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     putAmsSiteProperty = self.putProperty(configurations, "ams-site", services)
     putHbaseEnvProperty = self.putProperty(configurations, "ams-hbase-env", services)
     putGrafanaProperty = self.putProperty(configurations, "ams-grafana-env", services)
-    putGrafanaPropertyAttribute = self.putPropertyAttribute(configurations, "ams-grafana-env")
 
     amsCollectorHosts = self.getComponentHostNames(services, "AMBARI_METRICS", "METRICS_COLLECTOR")
 
-    if 'cluster-env' in services['configurations'] and \
-        'metrics_collector_external_hosts' in services['configurations']['cluster-env']['properties']:
-      metric_collector_host = services['configurations']['cluster-env']['properties']['metrics_collector_external_hosts']
+    clusterEnv = getServicesSiteProperties(services, 'cluster-env') or {}
+    if 'metrics_collector_external_hosts' in clusterEnv:
+      metric_collector_host = clusterEnv['metrics_collector_external_hosts']
     else:
-      metric_collector_host = 'localhost' if len(amsCollectorHosts) == 0 else amsCollectorHosts[0]
+      metric_collector_host = amsCollectorHosts[0] if amsCollectorHosts else 'localhost'
 
     putAmsSiteProperty("timeline.metrics.service.webapp.address", str(metric_collector_host) + ":6188")
 
-    log_dir = "/var/log/ambari-metrics-collector"
     if "ams-env" in services["configurations"]:
-      if "metrics_collector_log_dir" in services["configurations"]["ams-env"]["properties"]:
-        log_dir = services["configurations"]["ams-env"]["properties"]["metrics_collector_log_dir"]
+      log_dir = getServicesProperty(services, "ams-env", "metrics_collector_log_dir", "/var/log/ambari-metrics-collector")
       putHbaseEnvProperty("hbase_log_dir", log_dir)
 
-    defaultFs = 'file:///'
-    if "core-site" in services["configurations"] and \
-      "fs.defaultFS" in services["configurations"]["core-site"]["properties"]:
-      defaultFs = services["configurations"]["core-site"]["properties"]["fs.defaultFS"]
-
-    operatingMode = "embedded"
-    if "ams-site" in services["configurations"]:
-      if "timeline.metrics.service.operation.mode" in services["configurations"]["ams-site"]["properties"]:
-        operatingMode = services["configurations"]["ams-site"]["properties"]["timeline.metrics.service.operation.mode"]
+    defaultFs = getServicesProperty(services, "core-site", "fs.defaultFS", 'file:///')
+    operatingMode = getServicesProperty(services, "ams-site", "timeline.metrics.service.operation.mode", "embedded")
 
     if operatingMode == "distributed":
-      putAmsSiteProperty("timeline.metrics.service.watcher.disabled", 'true')
-      putAmsSiteProperty("timeline.metrics.host.aggregator.ttl", 259200)
-      putAmsHbaseSiteProperty("hbase.cluster.distributed", 'true')
-      putAmsHbaseSiteProperty("hbase.unsafe.stream.capability.enforce", 'true')
+      self.putProperties(configurations, "ams-site", {"timeline.metrics.service.watcher.disabled": 'true',
+                                                      "timeline.metrics.host.aggregator.ttl": 259200}, services)
+      self.putProperties(configurations, "ams-hbase-site", {"hbase.cluster.distributed": 'true',
+                                                            "hbase.unsafe.stream.capability.enforce": 'true'}, services)
     else:
-      putAmsSiteProperty("timeline.metrics.service.watcher.disabled", 'false')
-      putAmsSiteProperty("timeline.metrics.host.aggregator.ttl", 86400)
+      self.putProperties(configurations, "ams-site", {"timeline.metrics.service.watcher.disabled": 'false',
+                                                      "timeline.metrics.host.aggregator.ttl": 86400}, services)
       putAmsHbaseSiteProperty("hbase.cluster.distributed", 'false')
 
-    rootDir = "file:///var/lib/ambari-metrics-collector/hbase"
-    tmpDir = "/var/lib/ambari-metrics-collector/hbase-tmp"
-    zk_port_default = []
-    if "ams-hbase-site" in services["configurations"]:
-      if "hbase.rootdir" in services["configurations"]["ams-hbase-site"]["properties"]:
-        rootDir = services["configurations"]["ams-hbase-site"]["properties"]["hbase.rootdir"]
-      if "hbase.tmp.dir" in services["configurations"]["ams-hbase-site"]["properties"]:
-        tmpDir = services["configurations"]["ams-hbase-site"]["properties"]["hbase.tmp.dir"]
-      if "hbase.zookeeper.property.clientPort" in services["configurations"]["ams-hbase-site"]["properties"]:
-        zk_port_default = services["configurations"]["ams-hbase-site"]["properties"]["hbase.zookeeper.property.clientPort"]
-
-      # Skip recommendation item if default value is present
+    rootDir = getServicesProperty(services, "ams-hbase-site", "hbase.rootdir", "file:///var/lib/ambari-metrics-collector/hbase")
+    tmpDir = getServicesProperty(services, "ams-hbase-site", "hbase.tmp.dir", "/var/lib/ambari-metrics-collector/hbase-tmp")
+    zk_port_default = getServicesProperty(services, "ams-hbase-site", "hbase.zookeeper.property.clientPort", [])
+
+    # Skip recommendation item if default value is present
     if operatingMode == "distributed" and not "{{zookeeper_clientPort}}" in zk_port_default:
       zkPort = self.getZKPort(services)
       putAmsHbaseSiteProperty("hbase.zookeeper.property.clientPort", zkPort)
@@ -642,16 +767,16 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       putAmsHbaseSiteProperty("hbase.zookeeper.property.clientPort", "61181")
 
     mountpoints = ["/"]
+    hostsByName = self.getHostsByName(hosts)
     for collectorHostName in amsCollectorHosts:
-      for host in hosts["items"]:
-        if host["Hosts"]["host_name"] == collectorHostName:
-          mountpoints = self.getPreferredMountPoints(host["Hosts"])
-          break
+      host = hostsByName.get(collectorHostName)
+      if host is not None:
+        mountpoints = self.getPreferredMountPoints(host["Hosts"])
     isLocalRootDir = rootDir.startswith("file://") or (defaultFs.startswith("file://") and rootDir.startswith("/"))
     if isLocalRootDir:
-      rootDir = re.sub("^file:///|/", "", rootDir, count=1)
+      rootDir = LOCAL_DIR_PREFIX_PATTERN.sub("", rootDir, count=1)
       rootDir = "file://" + os.path.join(mountpoints[0], rootDir)
-    tmpDir = re.sub("^file:///|/", "", tmpDir, count=1)
+    tmpDir = LOCAL_DIR_PREFIX_PATTERN.sub("", tmpDir, count=1)
     if len(mountpoints) > 1 and isLocalRootDir:
       tmpDir = os.path.join(mountpoints[1], tmpDir)
     else:
@@ -672,38 +797,19 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     putAmsEnvProperty("metrics_collector_heapsize", collector_heapsize)
 
     # blockCache = 0.3, memstore = 0.35, phoenix-server = 0.15, phoenix-client = 0.25
-    putAmsHbaseSiteProperty("hfile.block.cache.size", 0.3)
-    putAmsHbaseSiteProperty("hbase.hregion.memstore.flush.size", 134217728)
-    putAmsHbaseSiteProperty("hbase.regionserver.global.memstore.upperLimit", 0.35)
-    putAmsHbaseSiteProperty("hbase.regionserver.global.memstore.lowerLimit", 0.3)
-
-    if len(amsCollectorHosts) > 1:
-      pass
-    else:
-      # blockCache = 0.3, memstore = 0.3, phoenix-server = 0.2, phoenix-client = 0.3
-      if total_sinks_count >= 2000:
-        putAmsHbaseSiteProperty("hbase.regionserver.handler.count", 60)
-        putAmsHbaseSiteProperty("hbase.regionserver.hlog.blocksize", 134217728)
-        putAmsHbaseSiteProperty("hbase.regionserver.maxlogs", 64)
-        putAmsHbaseSiteProperty("hbase.hregion.memstore.flush.size", 268435456)
-        putAmsHbaseSiteProperty("hbase.regionserver.global.memstore.upperLimit", 0.3)
-        putAmsHbaseSiteProperty("hbase.regionserver.global.memstore.lowerLimit", 0.25)
-        putAmsHbaseSiteProperty("phoenix.query.maxGlobalMemoryPercentage", 20)
-        putAmsHbaseSiteProperty("phoenix.coprocessor.maxMetaDataCacheSize", 81920000)
-        putAmsSiteProperty("phoenix.query.maxGlobalMemoryPercentage", 30)
-        putAmsSiteProperty("timeline.metrics.service.resultset.fetchSize", 10000)
-      elif total_sinks_count >= 500:
-        putAmsHbaseSiteProperty("hbase.regionserver.handler.count", 60)
-        putAmsHbaseSiteProperty("hbase.regionserver.hlog.blocksize", 134217728)
-        putAmsHbaseSiteProperty("hbase.regionserver.maxlogs", 64)
-        putAmsHbaseSiteProperty("hbase.hregion.memstore.flush.size", 268435456)
-        putAmsHbaseSiteProperty("phoenix.coprocessor.maxMetaDataCacheSize", 40960000)
-        putAmsSiteProperty("timeline.metrics.service.resultset.fetchSize", 5000)
-      else:
-        putAmsHbaseSiteProperty("phoenix.coprocessor.maxMetaDataCacheSize", 20480000)
-      pass
+    self.putProperties(configurations, "ams-hbase-site", {"hfile.block.cache.size": 0.3,
+                                                          "hbase.hregion.memstore.flush.size": 134217728,
+                                                          "hbase.regionserver.global.memstore.upperLimit": 0.35,
+                                                          "hbase.regionserver.global.memstore.lowerLimit": 0.3}, services)
+
+    if len(amsCollectorHosts) <= 1:
+      for minSinksCount, amsHbaseSiteProperties, amsSiteProperties in AMS_SINKS_COUNT_TIERS:
+        if total_sinks_count >= minSinksCount:
+          self.putProperties(configurations, "ams-hbase-site", amsHbaseSiteProperties, services)
+          self.putProperties(configurations, "ams-site", amsSiteProperties, services)
+          break
 
-    metrics_api_handlers = min(50, max(20, int(total_sinks_count / 100)))
+    metrics_api_handlers = min(50, max(20, total_sinks_count // 100))
     putAmsSiteProperty("timeline.metrics.service.handler.thread.count", metrics_api_handlers)
 
     # Distributed mode heap size
@@ -725,7 +831,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       dn_hosts = self.getComponentHostNames(services, "HDFS", "DATANODE")
       # call by Kerberos wizard sends only the service being affected
       # so it is possible for dn_hosts to be None but not amsCollectorHosts
-      if dn_hosts and len(dn_hosts) > 0:
+      if dn_hosts:
         if set(amsCollectorHosts).intersection(dn_hosts):
           collector_cohosted_with_dn = "true"
         else:
@@ -733,13 +839,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
         putAmsHbaseSiteProperty("dfs.client.read.shortcircuit", collector_cohosted_with_dn)
 
     #split points
-    scriptDir = os.path.dirname(os.path.abspath(__file__))
-    metricsDir = os.path.join(scriptDir, '../../../../common-services/AMBARI_METRICS/0.1.0/package')
-    serviceMetricsDir = os.path.join(metricsDir, 'files', 'service-metrics')
-    sys.path.append(os.path.join(metricsDir, 'scripts'))
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-
-    from split_points import FindSplitPointsForAMSRegions
+    servicesList = self.getRequestContext(services).servicesList
 
     ams_hbase_site = None
     ams_hbase_env = None
@@ -756,6 +856,15 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     if not ams_hbase_env:
       ams_hbase_env = configurations["ams-hbase-env"]["properties"]
 
+    scriptDir = os.path.dirname(os.path.abspath(__file__))
+    metricsDir = os.path.join(scriptDir, '../../../../common-services/AMBARI_METRICS/0.1.0/package')
+    serviceMetricsDir = os.path.join(metricsDir, 'files', 'service-metrics')
+    metricsScriptsDir = os.path.join(metricsDir, 'scripts')
+    if metricsScriptsDir not in sys.path:
+      sys.path.append(metricsScriptsDir)
+
+    from split_points import FindSplitPointsForAMSRegions
+
     split_point_finder = FindSplitPointsForAMSRegions(
       ams_hbase_site, ams_hbase_env, serviceMetricsDir, operatingMode, servicesList)
 
@@ -769,59 +878,49 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     putAmsSiteProperty("timeline.metrics.host.aggregate.splitpoints", ','.join(precision_splits))
     putAmsSiteProperty("timeline.metrics.cluster.aggregate.splitpoints", ','.join(aggregate_splits))
 
-    component_grafana_exists = False
-    for service in services['services']:
-      if 'components' in service:
-        for component in service['components']:
-          if 'StackServiceComponents' in component:
-            # If Grafana is installed the hostnames would indicate its location
-            if 'METRICS_GRAFANA' in component['StackServiceComponents']['component_name'] and\
-              len(component['StackServiceComponents']['hostnames']) != 0:
-              component_grafana_exists = True
-              break
-    pass
+    # If Grafana is installed the hostnames would indicate its location
+    component_grafana_exists = any('METRICS_GRAFANA' in componentName and componentHostnames
+                                   for (serviceName, componentName), componentHostnames
+                                   in self.getRequestContext(services).componentHostnames.iteritems())
 
     if not component_grafana_exists:
+      putGrafanaPropertyAttribute = self.putPropertyAttribute(configurations, "ams-grafana-env")
       putGrafanaPropertyAttribute("metrics_grafana_password", "visible", "false")
 
     pass
 
+  def getComponentHostNames(self, servicesDict, serviceName, componentName):
+    return self.getRequestContext(servicesDict).componentHostnames.get((serviceName, componentName))
+
   def getHostNamesWithComponent(self, serviceName, componentName, services):
     """
     Returns the list of hostnames on which service component is installed
     """
-    if services is not None and serviceName in [service["StackServices"]["service_name"] for service in services["services"]]:
-      service = [serviceEntry for serviceEntry in services["services"] if serviceEntry["StackServices"]["service_name"] == serviceName][0]
-      components = [componentEntry for componentEntry in service["components"] if componentEntry["StackServiceComponents"]["component_name"] == componentName]
-      if (len(components) > 0 and len(components[0]["StackServiceComponents"]["hostnames"]) > 0):
-        componentHostnames = components[0]["StackServiceComponents"]["hostnames"]
+    if services is not None:
+      componentHostnames = self.getComponentHostNames(services, serviceName, componentName)
+      if componentHostnames:
         return componentHostnames
     return []
 
   def getHostsWithComponent(self, serviceName, componentName, services, hosts):
-    if services is not None and hosts is not None and serviceName in [service["StackServices"]["service_name"] for service in services["services"]]:
-      service = [serviceEntry for serviceEntry in services["services"] if serviceEntry["StackServices"]["service_name"] == serviceName][0]
-      components = [componentEntry for componentEntry in service["components"] if componentEntry["StackServiceComponents"]["component_name"] == componentName]
-      if (len(components) > 0 and len(components[0]["StackServiceComponents"]["hostnames"]) > 0):
-        componentHostnames = components[0]["StackServiceComponents"]["hostnames"]
-        componentHosts = [host for host in hosts["items"] if host["Hosts"]["host_name"] in componentHostnames]
-        return componentHosts
+    if services is not None and hosts is not None:
+      componentHostnames = self.getComponentHostNames(services, serviceName, componentName)
+      if componentHostnames:
+        componentHostnames = set(componentHostnames)
+        return [host for host in hosts["items"] if host["Hosts"]["host_name"] in componentHostnames]
     return []
 
   def getHostWithComponent(self, serviceName, componentName, services, hosts):
     componentHosts = self.getHostsWithComponent(serviceName, componentName, services, hosts)
-    if (len(componentHosts) > 0):
+    if componentHosts:
       return componentHosts[0]
     return None
 
   def getHostComponentsByCategories(self, hostname, categories, services, hosts):
-    components = []
     if services is not None and hosts is not None:
-      for service in services["services"]:
-          components.extend([componentEntry for componentEntry in service["components"]
-                              if componentEntry["StackServiceComponents"]["component_category"] in categories
-                              and hostname in componentEntry["StackServiceComponents"]["hostnames"]])
-    return components
+      return [componentEntry for componentEntry in self.getRequestContext(services).getHostComponents(hostname)
+              if componentEntry["StackServiceComponents"]["component_category"] in categories]
+    return []
 
   def getZKHostPortString(self, services, include_port=True):
     """
@@ -829,25 +928,26 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     Example: zk.host1.org:2181,zk.host2.org:2181,zk.host3.org:2181
     include_port boolean param -> If port is also needed.
     """
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    include_zookeeper = "ZOOKEEPER" in servicesList
+    servicesSet = self.getRequestContext(services).servicesSet
+    include_zookeeper = "ZOOKEEPER" in servicesSet
     zookeeper_host_port = ''
 
     if include_zookeeper:
       zookeeper_hosts = self.getHostNamesWithComponent("ZOOKEEPER", "ZOOKEEPER_SERVER", services)
-      zookeeper_host_port_arr = []
 
       if include_port:
         zookeeper_port = self.getZKPort(services)
-        for i in range(len(zookeeper_hosts)):
-          zookeeper_host_port_arr.append(zookeeper_hosts[i] + ':' + zookeeper_port)
+        zookeeper_host_port = ",".join(zookeeper_host + ':' + zookeeper_port for zookeeper_host in zookeeper_hosts)
       else:
-        for i in range(len(zookeeper_hosts)):
-          zookeeper_host_port_arr.append(zookeeper_hosts[i])
-
-      zookeeper_host_port = ",".join(zookeeper_host_port_arr)
+        zookeeper_host_port = ",".join(zookeeper_hosts)
     return zookeeper_host_port
 
+  def getSortedZKHostPortString(self, services):
+    """
+    Returns getZKHostPortString with the host:port entries sorted.
+    """
+    return ",".join(sorted(self.getZKHostPortString(services).split(',')))
+
   def getZKPort(self, services):
     zookeeper_port = '2181'     #default port
     if 'zoo.cfg' in services['configurations'] and ('clientPort' in services['configurations']['zoo.cfg']['properties']):
@@ -865,10 +965,10 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       "components": components
     }
 
-    if len(hosts["items"]) > 0:
+    if hosts["items"]:
       nodeManagerHosts = self.getHostsWithComponent("YARN", "NODEMANAGER", services, hosts)
       # NodeManager host with least memory is generally used in calculations as it will work in larger hosts.
-      if nodeManagerHosts is not None and len(nodeManagerHosts) > 0:
+      if nodeManagerHosts:
         nodeManagerHost = nodeManagerHosts[0];
         for nmHost in nodeManagerHosts:
           if nmHost["Hosts"]["total_mem"] < nodeManagerHost["Hosts"]["total_mem"]:
@@ -880,68 +980,42 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       cluster["referenceHost"] = host
       cluster["cpu"] = host["cpu_count"]
       cluster["disk"] = len(host["disk_info"])
-      cluster["ram"] = int(host["total_mem"] / (1024 * 1024))
-
-    ramRecommendations = [
-      {"os":1, "hbase":1},
-      {"os":2, "hbase":1},
-      {"os":2, "hbase":2},
-      {"os":4, "hbase":4},
-      {"os":6, "hbase":8},
-      {"os":8, "hbase":8},
-      {"os":8, "hbase":8},
-      {"os":12, "hbase":16},
-      {"os":24, "hbase":24},
-      {"os":32, "hbase":32},
-      {"os":64, "hbase":32}
-    ]
-    index = {
-      cluster["ram"] <= 4: 0,
-      4 < cluster["ram"] <= 8: 1,
-      8 < cluster["ram"] <= 16: 2,
-      16 < cluster["ram"] <= 24: 3,
-      24 < cluster["ram"] <= 48: 4,
-      48 < cluster["ram"] <= 64: 5,
-      64 < cluster["ram"] <= 72: 6,
-      72 < cluster["ram"] <= 96: 7,
-      96 < cluster["ram"] <= 128: 8,
-      128 < cluster["ram"] <= 256: 9,
-      256 < cluster["ram"]: 10
-    }[1]
+      cluster["ram"] = host["total_mem"] // (1024 * 1024)
 
+    cluster.update(self.calculateClusterMemorySummary(cluster["cpu"], cluster["disk"], cluster["ram"], hBaseInstalled))
 
-    cluster["reservedRam"] = ramRecommendations[index]["os"]
-    cluster["hbaseRam"] = ramRecommendations[index]["hbase"]
-
-
-    cluster["minContainerSize"] = {
-      cluster["ram"] <= 4: 256,
-      4 < cluster["ram"] <= 8: 512,
-      8 < cluster["ram"] <= 24: 1024,
-      24 < cluster["ram"]: 2048
-    }[1]
+    return cluster
 
-    totalAvailableRam = cluster["ram"] - cluster["reservedRam"]
-    if cluster["hBaseInstalled"]:
-      totalAvailableRam -= cluster["hbaseRam"]
-    cluster["totalAvailableRam"] = max(512, totalAvailableRam * 1024)
+  def calculateClusterMemorySummary(self, cpu, disk, ram, hBaseInstalled):
+    """
+    Returns the container and memory sizing of a cluster summary, it only depends on the
+    reference host's cpu count, disk count and RAM.
+    """
+    memory = {}
+    memory["reservedRam"], memory["hbaseRam"] = RESERVED_RAM_RECOMMENDATIONS[bisect_left(RESERVED_RAM_THRESHOLDS, ram)]
+    memory["minContainerSize"] = MIN_CONTAINER_SIZES[bisect_left(MIN_CONTAINER_SIZE_THRESHOLDS, ram)]
+
+    totalAvailableRam = ram - memory["reservedRam"]
+    if hBaseInstalled:
+      totalAvailableRam -= memory["hbaseRam"]
+    memory["totalAvailableRam"] = max(512, totalAvailableRam * 1024)
     '''containers = max(3, min (2*cores,min (1.8*DISKS,(Total available RAM) / MIN_CONTAINER_SIZE))))'''
-    cluster["containers"] = round(max(3,
-                                min(2 * cluster["cpu"],
-                                    min(ceil(1.8 * cluster["disk"]),
-                                            cluster["totalAvailableRam"] / cluster["minContainerSize"]))))
+    memory["containers"] = round(max(3,
+                               min(2 * cpu,
+                                   min(ceil(1.8 * disk),
+                                           memory["totalAvailableRam"] / memory["minContainerSize"]))))
 
     '''ramPerContainers = max(2GB, RAM - reservedRam - hBaseRam) / containers'''
-    cluster["ramPerContainer"] = abs(cluster["totalAvailableRam"] / cluster["containers"])
+    memory["ramPerContainer"] = abs(memory["totalAvailableRam"] / memory["containers"])
     '''If greater than 1GB, value will be in multiples of 512.'''
-    if cluster["ramPerContainer"] > 1024:
-      cluster["ramPerContainer"] = int(cluster["ramPerContainer"] / 512) * 512
+    if memory["ramPerContainer"] > 1024:
+      memory["ramPerContainer"] = int(memory["ramPerContainer"]) // 512 * 512
 
-    cluster["mapMemory"] = int(cluster["ramPerContainer"])
-    cluster["reduceMemory"] = cluster["ramPerContainer"]
-    cluster["amMemory"] = max(cluster["mapMemory"], cluster["reduceMemory"])
+    memory["mapMemory"] = int(memory["ramPerContainer"])
+    memory["reduceMemory"] = memory["ramPerContainer"]
+    memory["amMemory"] = max(memory["mapMemory"], memory["reduceMemory"])
 
-    return cluster
+    return memory
 
   def getServiceConfigurationValidators(self):
     return {
@@ -963,52 +1037,40 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     putLogsearchProperty = self.putProperty(configurations, "logsearch-properties", services)
     infraSolrHosts = self.getComponentHostNames(services, "AMBARI_INFRA", "INFRA_SOLR")
 
-    if infraSolrHosts is not None and len(infraSolrHosts) > 0 \
+    if infraSolrHosts \
       and "logsearch-properties" in services["configurations"]:
       recommendedMinShards = len(infraSolrHosts)
       recommendedShards = 2 * len(infraSolrHosts)
       recommendedMaxShards = 3 * len(infraSolrHosts)
-      # recommend number of shard
-      putLogsearchAttribute = self.putPropertyAttribute(configurations, "logsearch-properties")
-      putLogsearchAttribute('logsearch.collection.service.logs.numshards', 'minimum', recommendedMinShards)
-      putLogsearchAttribute('logsearch.collection.service.logs.numshards', 'maximum', recommendedMaxShards)
-      putLogsearchProperty("logsearch.collection.service.logs.numshards", recommendedShards)
-
-      putLogsearchAttribute('logsearch.collection.audit.logs.numshards', 'minimum', recommendedMinShards)
-      putLogsearchAttribute('logsearch.collection.audit.logs.numshards', 'maximum', recommendedMaxShards)
-      putLogsearchProperty("logsearch.collection.audit.logs.numshards", recommendedShards)
-      # recommend replication factor
       replicationReccomendFloat = math.log(len(infraSolrHosts), 5)
       recommendedReplicationFactor = int(1 + math.floor(replicationReccomendFloat))
-      putLogsearchProperty("logsearch.collection.service.logs.replication.factor", recommendedReplicationFactor)
-      putLogsearchProperty("logsearch.collection.audit.logs.replication.factor", recommendedReplicationFactor)
+      putLogsearchAttribute = self.putPropertyAttribute(configurations, "logsearch-properties")
+      for numShardsProperty, replicationFactorProperty in LOGSEARCH_COLLECTION_PROPERTIES:
+        # recommend number of shard
+        putLogsearchAttribute(numShardsProperty, 'minimum', recommendedMinShards)
+        putLogsearchAttribute(numShardsProperty, 'maximum', recommendedMaxShards)
+        putLogsearchProperty(numShardsProperty, recommendedShards)
+        # recommend replication factor
+        putLogsearchProperty(replicationFactorProperty, recommendedReplicationFactor)
 
   def validateMinMax(self, items, recommendedDefaults, configurations):
-
-    # required for casting to the proper numeric type before comparison
-    def convertToNumber(number):
-      try:
-        return int(number)
-      except ValueError:
-        return float(number)
-
     for configName in configurations:
       validationItems = []
       if configName in recommendedDefaults and "property_attributes" in recommendedDefaults[configName]:
-        for propertyName in recommendedDefaults[configName]["property_attributes"]:
-          if propertyName in configurations[configName]["properties"]:
-            if "maximum" in recommendedDefaults[configName]["property_attributes"][propertyName] and \
-                propertyName in recommendedDefaults[configName]["properties"]:
-              userValue = convertToNumber(configurations[configName]["properties"][propertyName])
-              maxValue = convertToNumber(recommendedDefaults[configName]["property_attributes"][propertyName]["maximum"])
+        for propertyName, propertyAttributes in recommendedDefaults[configName]["property_attributes"].iteritems():
+          if propertyName in configurations[configName]["properties"] and \
+              ("maximum" in propertyAttributes or "minimum" in propertyAttributes) and \
+              propertyName in recommendedDefaults[configName]["properties"]:
+            # the user value is converted once for both bounds
+            userValue = convertToNumber(configurations[configName]["properties"][propertyName])
+            if "maximum" in propertyAttributes:
+              maxValue = convertToNumber(propertyAttributes["maximum"])
               if userValue > maxValue:
-                validationItems.extend([{"config-name": propertyName, "item": self.getWarnItem("Value is greater than the recommended maximum of {0} ".format(maxValue))}])
-            if "minimum" in recommendedDefaults[configName]["property_attributes"][propertyName] and \
-                    propertyName in recommendedDefaults[configName]["properties"]:
-              userValue = convertToNumber(configurations[configName]["properties"][propertyName])
-              minValue = convertToNumber(recommendedDefaults[configName]["property_attributes"][propertyName]["minimum"])
+                validationItems.append({"config-name": propertyName, "item": self.getWarnItem("Value is greater than the recommended maximum of {0} ".format(maxValue))})
+            if "minimum" in propertyAttributes:
+              minValue = convertToNumber(propertyAttributes["minimum"])
               if userValue < minValue:
-                validationItems.extend([{"config-name": propertyName, "item": self.getWarnItem("Value is less than the recommended minimum of {0} ".format(minValue))}])
+                validationItems.append({"config-name": propertyName, "item": self.getWarnItem("Value is less than the recommended minimum of {0} ".format(minValue))})
       items.extend(self.toConfigurationValidationProblems(validationItems, configName))
     pass
 
@@ -1021,7 +1083,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       correct_op_mode_item = self.getErrorItem("Correct value should be set.")
       pass
 
-    validationItems.extend([{"config-name":'timeline.metrics.service.operation.mode', "item": correct_op_mode_item }])
+    validationItems.append({"config-name":'timeline.metrics.service.operation.mode', "item": correct_op_mode_item })
     return self.toConfigurationValidationProblems(validationItems, "ams-site")
 
   def validateAmsHbaseSiteConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
@@ -1050,33 +1112,33 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     default_fs = core_site.get("fs.defaultFS") if core_site else "file:///"
     hbase_rootdir = properties.get("hbase.rootdir")
     hbase_tmpdir = properties.get("hbase.tmp.dir")
-    distributed = properties.get("hbase.cluster.distributed")
+    distributed = properties.get("hbase.cluster.distributed").lower()
     is_local_root_dir = hbase_rootdir.startswith("file://") or (default_fs.startswith("file://") and hbase_rootdir.startswith("/"))
 
     if op_mode == "distributed" and is_local_root_dir:
       rootdir_item = self.getWarnItem("In distributed mode hbase.rootdir should point to HDFS.")
     elif op_mode == "embedded":
-      if distributed.lower() == "false" and hbase_rootdir.startswith('/') or hbase_rootdir.startswith("hdfs://"):
+      if (distributed == "false" and hbase_rootdir.startswith('/')) or hbase_rootdir.startswith("hdfs://"):
         rootdir_item = self.getWarnItem("In embedded mode hbase.rootdir cannot point to schemaless values or HDFS, "
                                         "Example - file:// for localFS")
       pass
 
     distributed_item = None
-    if op_mode == "distributed" and not distributed.lower() == "true":
+    if op_mode == "distributed" and not distributed == "true":
       distributed_item = self.getErrorItem("hbase.cluster.distributed property should be set to true for "
                                            "distributed mode")
-    if op_mode == "embedded" and distributed.lower() == "true":
+    if op_mode == "embedded" and distributed == "true":
       distributed_item = self.getErrorItem("hbase.cluster.distributed property should be set to false for embedded mode")
 
     hbase_zk_client_port = properties.get("hbase.zookeeper.property.clientPort")
     zkPort = self.getZKPort(services)
     hbase_zk_client_port_item = None
-    if distributed.lower() == "true" and op_mode == "distributed" and \
+    if distributed == "true" and op_mode == "distributed" and \
         hbase_zk_client_port != zkPort and hbase_zk_client_port != "{{zookeeper_clientPort}}":
       hbase_zk_client_port_item = self.getErrorItem("In AMS distributed mode, hbase.zookeeper.property.clientPort "
                                                     "should be the cluster zookeeper server port : {0}".format(zkPort))
 
-    if distributed.lower() == "false" and op_mode == "embedded" and \
+    if distributed == "false" and op_mode == "embedded" and \
         hbase_zk_client_port == zkPort and hbase_zk_client_port != "{{zookeeper_clientPort}}":
       hbase_zk_client_port_item = self.getErrorItem("In AMS embedded mode, hbase.zookeeper.property.clientPort "
                                                     "should be a different port than cluster zookeeper port."
@@ -1086,62 +1148,64 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
                             {"config-name":'hbase.cluster.distributed', "item": distributed_item },
                             {"config-name":'hbase.zookeeper.property.clientPort', "item": hbase_zk_client_port_item }])
 
+    dn_hosts = self.getComponentHostNames(services, "HDFS", "DATANODE")
+    hdfs_site = getSiteProperties(configurations, "hdfs-site")
+    dfs_datadirs = hdfs_site.get("dfs.datanode.data.dir").split(",") if hdfs_site and "dfs.datanode.data.dir" in hdfs_site else []
+    hostsByName = self.getHostsByName(hosts)
     for collectorHostName in amsCollectorHosts:
-      for host in hosts["items"]:
-        if host["Hosts"]["host_name"] == collectorHostName:
-          if op_mode == 'embedded' or is_local_root_dir:
-            validationItems.extend([{"config-name": 'hbase.rootdir', "item": self.validatorEnoughDiskSpace(properties, 'hbase.rootdir', host["Hosts"], recommendedDiskSpace)}])
-            validationItems.extend([{"config-name": 'hbase.rootdir', "item": self.validatorNotRootFs(properties, recommendedDefaults, 'hbase.rootdir', host["Hosts"])}])
-            validationItems.extend([{"config-name": 'hbase.tmp.dir', "item": self.validatorNotRootFs(properties, recommendedDefaults, 'hbase.tmp.dir', host["Hosts"])}])
-
-          dn_hosts = self.getComponentHostNames(services, "HDFS", "DATANODE")
-          if is_local_root_dir:
-            mountPoints = []
-            for mountPoint in host["Hosts"]["disk_info"]:
-              mountPoints.append(mountPoint["mountpoint"])
-            hbase_rootdir_mountpoint = getMountPointForDir(hbase_rootdir, mountPoints)
-            hbase_tmpdir_mountpoint = getMountPointForDir(hbase_tmpdir, mountPoints)
-            preferred_mountpoints = self.getPreferredMountPoints(host['Hosts'])
-            # hbase.rootdir and hbase.tmp.dir shouldn't point to the same partition
-            # if multiple preferred_mountpoints exist
-            if hbase_rootdir_mountpoint == hbase_tmpdir_mountpoint and \
-              len(preferred_mountpoints) > 1:
-              item = self.getWarnItem("Consider not using {0} partition for storing metrics temporary data. "
-                                      "{0} partition is already used as hbase.rootdir to store metrics data".format(hbase_tmpdir_mountpoint))
-              validationItems.extend([{"config-name":'hbase.tmp.dir', "item": item}])
-
-            # if METRICS_COLLECTOR is co-hosted with DATANODE
-            # cross-check dfs.datanode.data.dir and hbase.rootdir
-            # they shouldn't share same disk partition IO
-            hdfs_site = getSiteProperties(configurations, "hdfs-site")
-            dfs_datadirs = hdfs_site.get("dfs.datanode.data.dir").split(",") if hdfs_site and "dfs.datanode.data.dir" in hdfs_site else []
-            if dn_hosts and collectorHostName in dn_hosts and ams_site and \
-              dfs_datadirs and len(preferred_mountpoints) > len(dfs_datadirs):
-              for dfs_datadir in dfs_datadirs:
-                dfs_datadir_mountpoint = getMountPointForDir(dfs_datadir, mountPoints)
-                if dfs_datadir_mountpoint == hbase_rootdir_mountpoint:
-                  item = self.getWarnItem("Consider not using {0} partition for storing metrics data. "
-                                          "{0} is already used by datanode to store HDFS data".format(hbase_rootdir_mountpoint))
-                  validationItems.extend([{"config-name": 'hbase.rootdir', "item": item}])
-                  break
-          # If no local DN in distributed mode
-          elif collectorHostName not in dn_hosts and distributed.lower() == "true":
-            item = self.getWarnItem("It's recommended to install Datanode component on {0} "
-                                    "to speed up IO operations between HDFS and Metrics "
-                                    "Collector in distributed mode ".format(collectorHostName))
-            validationItems.extend([{"config-name": "hbase.cluster.distributed", "item": item}])
-          # Short circuit read should be enabled in distibuted mode
-          # if local DN installed
-          else:
-            validationItems.extend([{"config-name": "dfs.client.read.shortcircuit", "item": self.validatorEqualsToRecommendedItem(properties, recommendedDefaults, "dfs.client.read.shortcircuit")}])
+      host = hostsByName.get(collectorHostName)
+      if host is None:
+        continue
+      if op_mode == 'embedded' or is_local_root_dir:
+        validationItems.append({"config-name": 'hbase.rootdir', "item": self.validatorEnoughDiskSpace(properties, 'hbase.rootdir', host["Hosts"], recommendedDiskSpace)})
+        validationItems.append({"config-name": 'hbase.rootdir', "item": self.validatorNotRootFs(properties, recommendedDefaults, 'hbase.rootdir', host["Hosts"])})
+        validationItems.append({"config-name": 'hbase.tmp.dir', "item": self.validatorNotRootFs(properties, recommendedDefaults, 'hbase.tmp.dir', host["Hosts"])})
+
+      if is_local_root_dir:
+        mountPoints = []
+        for mountPoint in host["Hosts"]["disk_info"]:
+          mountPoints.append(mountPoint["mountpoint"])
+        hbase_rootdir_mountpoint = getMountPointForDir(hbase_rootdir, mountPoints)
+        hbase_tmpdir_mountpoint = getMountPointForDir(hbase_tmpdir, mountPoints)
+        preferred_mountpoints = self.getPreferredMountPoints(host['Hosts'])
+        # hbase.rootdir and hbase.tmp.dir shouldn't point to the same partition
+        # if multiple preferred_mountpoints exist
+        if hbase_rootdir_mountpoint == hbase_tmpdir_mountpoint and \
+          len(preferred_mountpoints) > 1:
+          item = self.getWarnItem("Consider not using {0} partition for storing metrics temporary data. "
+                                  "{0} partition is already used as hbase.rootdir to store metrics data".format(hbase_tmpdir_mountpoint))
+          validationItems.append({"config-name":'hbase.tmp.dir', "item": item})
+
+        # if METRICS_COLLECTOR is co-hosted with DATANODE
+        # cross-check dfs.datanode.data.dir and hbase.rootdir
+        # they shouldn't share same disk partition IO
+        if dn_hosts and collectorHostName in dn_hosts and ams_site and \
+          dfs_datadirs and len(preferred_mountpoints) > len(dfs_datadirs):
+          for dfs_datadir in dfs_datadirs:
+            dfs_datadir_mountpoint = getMountPointForDir(dfs_datadir, mountPoints)
+            if dfs_datadir_mountpoint == hbase_rootdir_mountpoint:
+              item = self.getWarnItem("Consider not using {0} partition for storing metrics data. "
+                                      "{0} is already used by datanode to store HDFS data".format(hbase_rootdir_mountpoint))
+              validationItems.append({"config-name": 'hbase.rootdir', "item": item})
+              break
+      # If no local DN in distributed mode
+      elif collectorHostName not in dn_hosts and distributed == "true":
+        item = self.getWarnItem("It's recommended to install Datanode component on {0} "
+                                "to speed up IO operations between HDFS and Metrics "
+                                "Collector in distributed mode ".format(collectorHostName))
+        validationItems.append({"config-name": "hbase.cluster.distributed", "item": item})
+      # Short circuit read should be enabled in distibuted mode
+      # if local DN installed
+      else:
+        validationItems.append({"config-name": "dfs.client.read.shortcircuit", "item": self.validatorEqualsToRecommendedItem(properties, recommendedDefaults, "dfs.client.read.shortcircuit")})
 
     return self.toConfigurationValidationProblems(validationItems, "ams-hbase-site")
 
   def validateStormConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
     validationItems = []
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
+    servicesSet = self.getRequestContext(services).servicesSet
     # Storm AMS integration
-    if 'AMBARI_METRICS' in servicesList and "metrics.reporter.register" in properties and \
+    if 'AMBARI_METRICS' in servicesSet and "metrics.reporter.register" in properties and \
       "org.apache.hadoop.metrics2.sink.storm.StormTimelineMetricsReporter" not in properties.get("metrics.reporter.register"):
 
       validationItems.append({"config-name": 'metrics.reporter.register',
@@ -1151,50 +1215,42 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     return self.toConfigurationValidationProblems(validationItems, "storm-site")
 
   def validateStormRangerPluginConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
-    validationItems = []
-    ranger_plugin_properties = getSiteProperties(configurations, "ranger-storm-plugin-properties")
-    ranger_plugin_enabled = ranger_plugin_properties['ranger-storm-plugin-enabled'] if ranger_plugin_properties else 'No'
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if ranger_plugin_enabled.lower() == 'yes':
-      # ranger-storm-plugin must be enabled in ranger-env
-      ranger_env = getServicesSiteProperties(services, 'ranger-env')
-      if not ranger_env or not 'ranger-storm-plugin-enabled' in ranger_env or \
-              ranger_env['ranger-storm-plugin-enabled'].lower() != 'yes':
-        validationItems.append({"config-name": 'ranger-storm-plugin-enabled',
-                                "item": self.getWarnItem(
-                                    "ranger-storm-plugin-properties/ranger-storm-plugin-enabled must correspond ranger-env/ranger-storm-plugin-enabled")})
-    if ("RANGER" in servicesList) and (ranger_plugin_enabled.lower() == 'Yes'.lower()) and not 'KERBEROS' in servicesList:
-      validationItems.append({"config-name": "ranger-storm-plugin-enabled",
-                              "item": self.getWarnItem(
-                                "Ranger Storm plugin should not be enabled in non-kerberos environment.")})
+    validationItems = self.getRangerPluginValidationItems(configurations, services, "storm")
     return self.toConfigurationValidationProblems(validationItems, "ranger-storm-plugin-properties")
 
   def validateKafkaRangerPluginConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
+    validationItems = self.getRangerPluginValidationItems(configurations, services, "kafka")
+    return self.toConfigurationValidationProblems(validationItems, "ranger-kafka-plugin-properties")
+
+  def getRangerPluginValidationItems(self, configurations, services, serviceName):
+    """
+    Validates ranger-<service>-plugin-properties/ranger-<service>-plugin-enabled, shared by the
+    Kafka, Storm and NiFi Ranger plugin validators.
+    """
     validationItems = []
-    ranger_plugin_properties = getSiteProperties(configurations, "ranger-kafka-plugin-properties")
-    ranger_plugin_enabled = ranger_plugin_properties['ranger-kafka-plugin-enabled'] if ranger_plugin_properties else 'No'
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if ranger_plugin_enabled.lower() == 'yes':
-      # ranger-kafka-plugin must be enabled in ranger-env
+    pluginSite = "ranger-{0}-plugin-properties".format(serviceName)
+    pluginProperty = "ranger-{0}-plugin-enabled".format(serviceName)
+    ranger_plugin_properties = getSiteProperties(configurations, pluginSite)
+    ranger_plugin_enabled = ranger_plugin_properties.get(pluginProperty, 'No') if ranger_plugin_properties else 'No'
+    if ranger_plugin_enabled.lower() in PLUGIN_ENABLED_VALUES:
+      # the plugin must be enabled in ranger-env too
       ranger_env = getServicesSiteProperties(services, 'ranger-env')
-      if not ranger_env or not 'ranger-kafka-plugin-enabled' in ranger_env or \
-              ranger_env['ranger-kafka-plugin-enabled'].lower() != 'yes':
-        validationItems.append({"config-name": 'ranger-kafka-plugin-enabled',
+      if not ranger_env or ranger_env.get(pluginProperty, '').lower() not in PLUGIN_ENABLED_VALUES:
+        validationItems.append({"config-name": pluginProperty,
                                 "item": self.getWarnItem(
-                                    "ranger-kafka-plugin-properties/ranger-kafka-plugin-enabled must correspond ranger-env/ranger-kafka-plugin-enabled")})
-
-    if ("RANGER" in servicesList) and (ranger_plugin_enabled.lower() == 'yes') and not 'KERBEROS' in servicesList:
-      validationItems.append({"config-name": "ranger-kafka-plugin-enabled",
-                              "item": self.getWarnItem(
-                              "Ranger Kafka plugin should not be enabled in non-kerberos environment.")})
+                                    "{0}/{1} must correspond ranger-env/{1}".format(pluginSite, pluginProperty))})
 
-    return self.toConfigurationValidationProblems(validationItems, "ranger-kafka-plugin-properties")
+      kerberosOnlyMessage = RANGER_ENV_KERBEROS_ONLY_PLUGINS.get(pluginProperty)
+      servicesSet = self.getRequestContext(services).servicesSet
+      if kerberosOnlyMessage and "RANGER" in servicesSet and "KERBEROS" not in servicesSet:
+        validationItems.append({"config-name": pluginProperty, "item": self.getWarnItem(kerberosOnlyMessage)})
+    return validationItems
 
   def validateRangerAdminConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
     ranger_site = properties
     validationItems = []
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if 'RANGER' in servicesList and 'policymgr_external_url' in ranger_site:
+    servicesSet = self.getRequestContext(services).servicesSet
+    if 'RANGER' in servicesSet and 'policymgr_external_url' in ranger_site:
       policymgr_mgr_url = ranger_site['policymgr_external_url']
       if policymgr_mgr_url.endswith('/'):
         validationItems.append({'config-name':'policymgr_external_url',
@@ -1204,32 +1260,24 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
   def validateRangerConfigurationsEnv(self, properties, recommendedDefaults, configurations, services, hosts):
     ranger_env_properties = properties
     validationItems = []
-    security_enabled = False
 
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if 'KERBEROS' in servicesList:
-      security_enabled = True
+    servicesSet = self.getRequestContext(services).servicesSet
+    security_enabled = 'KERBEROS' in servicesSet
 
-    if "ranger-storm-plugin-enabled" in ranger_env_properties and ranger_env_properties['ranger-storm-plugin-enabled'].lower() == 'yes' and not security_enabled:
-      validationItems.append({"config-name": "ranger-storm-plugin-enabled",
-                              "item": self.getWarnItem("Ranger Storm plugin should not be enabled in non-kerberos environment.")})
-    if "ranger-kafka-plugin-enabled" in ranger_env_properties and ranger_env_properties["ranger-kafka-plugin-enabled"].lower() == 'yes' and not security_enabled:
-      validationItems.append({"config-name": "ranger-kafka-plugin-enabled",
-                              "item": self.getWarnItem(
-                                "Ranger Kafka plugin should not be enabled in non-kerberos environment.")})
+    if not security_enabled:
+      for pluginProperty, message in RANGER_ENV_KERBEROS_ONLY_PLUGINS.iteritems():
+        if ranger_env_properties.get(pluginProperty, '').lower() in PLUGIN_ENABLED_VALUES:
+          validationItems.append({"config-name": pluginProperty, "item": self.getWarnItem(message)})
     return self.toConfigurationValidationProblems(validationItems, "ranger-env")
 
   def validateRangerTagsyncConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
     ranger_tagsync_properties = properties
     validationItems = []
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-
-    has_atlas = False
-    if "RANGER" in servicesList:
-      has_atlas = not "ATLAS" in servicesList
+    servicesSet = self.getRequestContext(services).servicesSet
 
-      if has_atlas and 'ranger.tagsync.source.atlas' in ranger_tagsync_properties and \
-              ranger_tagsync_properties['ranger.tagsync.source.atlas'].lower() == 'true':
+    if "RANGER" in servicesSet and "ATLAS" not in servicesSet:
+      source_atlas = ranger_tagsync_properties.get('ranger.tagsync.source.atlas')
+      if source_atlas in TRUE_LITERALS or (source_atlas and source_atlas.lower() == 'true'):
         validationItems.append({"config-name": "ranger.tagsync.source.atlas",
                                 "item": self.getWarnItem(
                                     "Need to Install ATLAS service to set ranger.tagsync.source.atlas as true.")})
@@ -1246,15 +1294,15 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
 
     regionServerItem = self.validatorLessThenDefaultValue(properties, recommendedDefaults, "hbase_regionserver_heapsize") ## FIXME if new service added
     if regionServerItem:
-      validationItems.extend([{"config-name": "hbase_regionserver_heapsize", "item": regionServerItem}])
+      validationItems.append({"config-name": "hbase_regionserver_heapsize", "item": regionServerItem})
 
     hbaseMasterHeapsizeItem = self.validatorLessThenDefaultValue(properties, recommendedDefaults, "hbase_master_heapsize")
     if hbaseMasterHeapsizeItem:
-      validationItems.extend([{"config-name": "hbase_master_heapsize", "item": hbaseMasterHeapsizeItem}])
+      validationItems.append({"config-name": "hbase_master_heapsize", "item": hbaseMasterHeapsizeItem})
 
     logDirItem = self.validatorEqualsPropertyItem(properties, "hbase_log_dir", ams_env, "metrics_collector_log_dir")
     if logDirItem:
-      validationItems.extend([{"config-name": "hbase_log_dir", "item": logDirItem}])
+      validationItems.append({"config-name": "hbase_log_dir", "item": logDirItem})
 
     collector_heapsize = to_number(ams_env.get("metrics_collector_heapsize"))
     hbase_master_heapsize = to_number(properties["hbase_master_heapsize"])
@@ -1271,106 +1319,86 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       minMasterXmn = 0.12 * hbase_master_heapsize
       maxMasterXmn = 0.2 * hbase_master_heapsize
       if hbase_master_xmn_size < minMasterXmn:
-        masterXmnItem = self.getWarnItem("Value is lesser than the recommended minimum Xmn size of {0} "
-                                         "(12% of hbase_master_heapsize)".format(int(ceil(minMasterXmn))))
+        masterXmnItem = self.getWarnItem(XMN_SIZE_BELOW_MIN_MESSAGE.format(int(ceil(minMasterXmn)), "hbase_master_heapsize"))
 
       if hbase_master_xmn_size > maxMasterXmn:
-        masterXmnItem = self.getWarnItem("Value is greater than the recommended maximum Xmn size of {0} "
-                                         "(20% of hbase_master_heapsize)".format(int(floor(maxMasterXmn))))
+        masterXmnItem = self.getWarnItem(XMN_SIZE_ABOVE_MAX_MESSAGE.format(int(floor(maxMasterXmn)), "hbase_master_heapsize"))
 
       minRegionServerXmn = 0.12 * hbase_regionserver_heapsize
       maxRegionServerXmn = 0.2 * hbase_regionserver_heapsize
       if hbase_regionserver_xmn_size < minRegionServerXmn:
-        regionServerXmnItem = self.getWarnItem("Value is lesser than the recommended minimum Xmn size of {0} "
-                                               "(12% of hbase_regionserver_heapsize)"
-                                               .format(int(ceil(minRegionServerXmn))))
+        regionServerXmnItem = self.getWarnItem(XMN_SIZE_BELOW_MIN_MESSAGE.format(int(ceil(minRegionServerXmn)),
+                                                                                 "hbase_regionserver_heapsize"))
 
       if hbase_regionserver_xmn_size > maxRegionServerXmn:
-        regionServerXmnItem = self.getWarnItem("Value is greater than the recommended maximum Xmn size of {0} "
-                                               "(20% of hbase_regionserver_heapsize)"
-                                               .format(int(floor(maxRegionServerXmn))))
+        regionServerXmnItem = self.getWarnItem(XMN_SIZE_ABOVE_MAX_MESSAGE.format(int(floor(maxRegionServerXmn)),
+                                                                                 "hbase_regionserver_heapsize"))
     else:
       minMasterXmn = 0.12 * (hbase_master_heapsize + hbase_regionserver_heapsize)
       maxMasterXmn = 0.2 *  (hbase_master_heapsize + hbase_regionserver_heapsize)
       if hbase_master_xmn_size < minMasterXmn:
-        masterXmnItem = self.getWarnItem("Value is lesser than the recommended minimum Xmn size of {0} "
-                                         "(12% of hbase_master_heapsize + hbase_regionserver_heapsize)"
-                                         .format(int(ceil(minMasterXmn))))
+        masterXmnItem = self.getWarnItem(XMN_SIZE_BELOW_MIN_MESSAGE.format(int(ceil(minMasterXmn)),
+                                                                           "hbase_master_heapsize + hbase_regionserver_heapsize"))
 
       if hbase_master_xmn_size > maxMasterXmn:
-        masterXmnItem = self.getWarnItem("Value is greater than the recommended maximum Xmn size of {0} "
-                                         "(20% of hbase_master_heapsize + hbase_regionserver_heapsize)"
-                                         .format(int(floor(maxMasterXmn))))
+        masterXmnItem = self.getWarnItem(XMN_SIZE_ABOVE_MAX_MESSAGE.format(int(floor(maxMasterXmn)),
+                                                                           "hbase_master_heapsize + hbase_regionserver_heapsize"))
     if masterXmnItem:
-      validationItems.extend([{"config-name": "hbase_master_xmn_size", "item": masterXmnItem}])
+      validationItems.append({"config-name": "hbase_master_xmn_size", "item": masterXmnItem})
 
     if regionServerXmnItem:
-      validationItems.extend([{"config-name": "regionserver_xmn_size", "item": regionServerXmnItem}])
+      validationItems.append({"config-name": "regionserver_xmn_size", "item": regionServerXmnItem})
 
-    if hbaseMasterHeapsizeItem is None:
-      hostMasterComponents = {}
-
-      for service in services["services"]:
-        for component in service["components"]:
-          if component["StackServiceComponents"]["hostnames"] is not None:
-            for hostName in component["StackServiceComponents"]["hostnames"]:
-              if self.isMasterComponent(component):
-                if hostName not in hostMasterComponents.keys():
-                  hostMasterComponents[hostName] = []
-                hostMasterComponents[hostName].append(component["StackServiceComponents"]["component_name"])
-
-      amsCollectorHosts = self.getComponentHostNames(services, "AMBARI_METRICS", "METRICS_COLLECTOR")
+    amsCollectorHosts = self.getComponentHostNames(services, "AMBARI_METRICS", "METRICS_COLLECTOR")
+    # the collector host checks below need at least one collector
+    if hbaseMasterHeapsizeItem is None and amsCollectorHosts:
+      context = self.getRequestContext(services)
+      hostsByName = self.getHostsByName(hosts)
       for collectorHostName in amsCollectorHosts:
-        for host in hosts["items"]:
-          if host["Hosts"]["host_name"] == collectorHostName:
-            # AMS Collector co-hosted with other master components in bigger clusters
-            if len(hosts['items']) > 31 and \
-                            len(hostMasterComponents[collectorHostName]) > 2 and \
-                            host["Hosts"]["total_mem"] < 32*mb: # < 32Gb(total_mem in k)
-              masterHostMessage = "Host {0} is used by multiple master components ({1}). " \
-                                  "It is recommended to use a separate host for the " \
-                                  "Ambari Metrics Collector component and ensure " \
-                                  "the host has sufficient memory available."
-
-              hbaseMasterHeapsizeItem = self.getWarnItem(masterHostMessage.format(
-                  collectorHostName, str(", ".join(hostMasterComponents[collectorHostName]))))
-              if hbaseMasterHeapsizeItem:
-                validationItems.extend([{"config-name": "hbase_master_heapsize", "item": hbaseMasterHeapsizeItem}])
-
-            # Check for unused RAM on AMS Collector node
-            hostComponents = []
-            for service in services["services"]:
-              for component in service["components"]:
-                if component["StackServiceComponents"]["hostnames"] is not None:
-                  if collectorHostName in component["StackServiceComponents"]["hostnames"]:
-                    hostComponents.append(component["StackServiceComponents"]["component_name"])
-
-            requiredMemory = getMemorySizeRequired(hostComponents, configurations)
-            unusedMemory = host["Hosts"]["total_mem"] * 1024 - requiredMemory # in bytes
-            if unusedMemory > 4*gb:  # warn user, if more than 4GB RAM is unused
-              heapPropertyToIncrease = "hbase_regionserver_heapsize" if is_hbase_distributed else "hbase_master_heapsize"
-              xmnPropertyToIncrease = "regionserver_xmn_size" if is_hbase_distributed else "hbase_master_xmn_size"
-              recommended_collector_heapsize = int((unusedMemory - 4*gb)/5) + collector_heapsize*mb
-              recommended_hbase_heapsize = int((unusedMemory - 4*gb)*4/5) + to_number(properties.get(heapPropertyToIncrease))*mb
-              recommended_hbase_heapsize = min(32*gb, recommended_hbase_heapsize) #Make sure heapsize <= 32GB
-              recommended_xmn_size = round_to_n(0.12*recommended_hbase_heapsize/mb,128)
-
-              if collector_heapsize < recommended_collector_heapsize or \
-                  to_number(properties[heapPropertyToIncrease]) < recommended_hbase_heapsize:
-                collectorHeapsizeItem = self.getWarnItem("{0} MB RAM is unused on the host {1} based on components " \
-                                                         "assigned. Consider allocating  {2} MB to " \
-                                                         "metrics_collector_heapsize in ams-env, " \
-                                                         "{3} MB to {4} in ams-hbase-env"
-                                                         .format(unusedMemory/mb, collectorHostName,
-                                                                 recommended_collector_heapsize/mb,
-                                                                 recommended_hbase_heapsize/mb,
-                                                                 heapPropertyToIncrease))
-                validationItems.extend([{"config-name": heapPropertyToIncrease, "item": collectorHeapsizeItem}])
-
-              if to_number(properties[xmnPropertyToIncrease]) < recommended_hbase_heapsize:
-                xmnPropertyToIncreaseItem = self.getWarnItem("Consider allocating {0} MB to use up some unused memory "
-                                                             "on host".format(recommended_xmn_size))
-                validationItems.extend([{"config-name": xmnPropertyToIncrease, "item": xmnPropertyToIncreaseItem}])
+        host = hostsByName.get(collectorHostName)
+        if host is None:
+          continue
+        collectorHostComponents = context.getHostComponents(collectorHostName)
+        hostMasterComponents = [component["StackServiceComponents"]["component_name"]
+                                for component in collectorHostComponents if self.isMasterComponent(component)]
+        # AMS Collector co-hosted with other master components in bigger clusters
+        if len(hosts['items']) > 31 and \
+                        len(hostMasterComponents) > 2 and \
+                        host["Hosts"]["total_mem"] < 32*mb: # < 32Gb(total_mem in k)
+          hbaseMasterHeapsizeItem = self.getWarnItem(COLLECTOR_HOST_SHARED_MESSAGE.format(
+              collectorHostName, ", ".join(hostMasterComponents)))
+          if hbaseMasterHeapsizeItem:
+            validationItems.append({"config-name": "hbase_master_heapsize", "item": hbaseMasterHeapsizeItem})
+
+        # Check for unused RAM on AMS Collector node
+        hostComponents = [component["StackServiceComponents"]["component_name"] for component in collectorHostComponents]
+
+        requiredMemory = getMemorySizeRequired(hostComponents, configurations)
+        unusedMemory = host["Hosts"]["total_mem"] * 1024 - requiredMemory # in bytes
+        if unusedMemory > 4*gb:  # warn user, if more than 4GB RAM is unused
+          heapPropertyToIncrease = "hbase_regionserver_heapsize" if is_hbase_distributed else "hbase_master_heapsize"
+          xmnPropertyToIncrease = "regionserver_xmn_size" if is_hbase_distributed else "hbase_master_xmn_size"
+          recommended_collector_heapsize = (unusedMemory - 4*gb) // 5 + collector_heapsize*mb
+          recommended_hbase_heapsize = (unusedMemory - 4*gb)*4 // 5 + to_number(properties.get(heapPropertyToIncrease))*mb
+          recommended_hbase_heapsize = min(32*gb, recommended_hbase_heapsize) #Make sure heapsize <= 32GB
+          recommended_xmn_size = round_to_n(0.12*recommended_hbase_heapsize/mb,128)
+
+          if collector_heapsize < recommended_collector_heapsize or \
+              to_number(properties[heapPropertyToIncrease]) < recommended_hbase_heapsize:
+            collectorHeapsizeItem = self.getWarnItem("{0} MB RAM is unused on the host {1} based on components " \
+                                                     "assigned. Consider allocating  {2} MB to " \
+                                                     "metrics_collector_heapsize in ams-env, " \
+                                                     "{3} MB to {4} in ams-hbase-env"
+                                                     .format(unusedMemory // mb, collectorHostName,
+                                                             recommended_collector_heapsize // mb,
+                                                             recommended_hbase_heapsize // mb,
+                                                             heapPropertyToIncrease))
+            validationItems.append({"config-name": heapPropertyToIncrease, "item": collectorHeapsizeItem})
+
+          if to_number(properties[xmnPropertyToIncrease]) < recommended_hbase_heapsize:
+            xmnPropertyToIncreaseItem = self.getWarnItem("Consider allocating {0} MB to use up some unused memory "
+                                                         "on host".format(recommended_xmn_size))
+            validationItems.append({"config-name": xmnPropertyToIncrease, "item": xmnPropertyToIncreaseItem})
       pass
 
     return self.toConfigurationValidationProblems(validationItems, "ams-hbase-env")
@@ -1381,12 +1409,12 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
 
     #Adding Ranger Plugin logic here
     ranger_plugin_properties = getSiteProperties(configurations, "ranger-kafka-plugin-properties")
-    ranger_plugin_enabled = ranger_plugin_properties['ranger-kafka-plugin-enabled'] if ranger_plugin_properties else 'No'
+    ranger_plugin_enabled = ranger_plugin_properties.get('ranger-kafka-plugin-enabled', 'No') if ranger_plugin_properties else 'No'
     prop_name = 'authorizer.class.name'
     prop_val = "org.apache.ranger.authorization.kafka.authorizer.RangerKafkaAuthorizer"
-    servicesList = [service["StackServices"]["service_name"] for service in services["services"]]
-    if ("RANGER" in servicesList) and (ranger_plugin_enabled.lower() == 'Yes'.lower()):
-      if kafka_broker[prop_name] != prop_val:
+    servicesSet = self.getRequestContext(services).servicesSet
+    if ("RANGER" in servicesSet) and (ranger_plugin_enabled.lower() in PLUGIN_ENABLED_VALUES):
+      if kafka_broker.get(prop_name) != prop_val:
         validationItems.append({"config-name": prop_name,
                                 "item": self.getWarnItem(
                                     "If Ranger Kafka Plugin is enabled." \
@@ -1395,17 +1423,12 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     return self.toConfigurationValidationProblems(validationItems, "kafka-broker")
 
   def __find_ca(self, services):
-    for service in services['services']:
-      if 'components' in service:
-        for component in service['components']:
-          stackServiceComponent = component['StackServiceComponents']
-          if 'NIFI_CA' == stackServiceComponent['component_name'] and stackServiceComponent['hostnames']:
-            return True
-    return False
+    # NIFI_CA is only defined by the NIFI service
+    return bool(self.getComponentHostNames(services, "NIFI", "NIFI_CA"))
     
   def validateConfigurationsForSite(self, configurations, recommendedDefaults, services, hosts, siteName, method):
     if siteName == 'nifi-ambari-ssl-config':
-      return method(self.getSiteProperties(configurations, siteName), None, configurations, services, hosts)
+      return method(getSiteProperties(configurations, siteName), None, configurations, services, hosts)
     else:
       return DefaultStackAdvisor.validateConfigurationsForSite(self, configurations, recommendedDefaults, services, hosts, siteName, method)
 
@@ -1421,35 +1444,19 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       if properties['nifi.toolkit.tls.token']:
         validationItems.append({"config-name": 'nifi.toolkit.tls.token', 'item': self.getWarnItem("If NiFi Certificate Authority is not used, nifi.toolkit.tls.token doesn't do anything.")})
       if ssl_enabled:
-        if not properties['nifi.security.keystorePasswd']:
-          validationItems.append({"config-name": 'nifi.security.keystorePasswd', 'item': self.getErrorItem('If NiFi Certificate Authority is not used and SSL is enabled, must specify nifi.security.keystorePasswd')})
-        if not properties['nifi.security.keyPasswd']:
-          validationItems.append({"config-name": 'nifi.security.keyPasswd', 'item': self.getErrorItem('If NiFi Certificate Authority is not used and SSL is enabled, must specify nifi.security.keyPasswd')})
-        if not properties['nifi.security.truststorePasswd']:
-          validationItems.append({"config-name": 'nifi.security.truststorePasswd', 'item': self.getErrorItem('If NiFi Certificate Authority is not used and SSL is enabled, must specify nifi.security.truststorePasswd')})
-        if not properties['nifi.security.keystoreType']:
-          validationItems.append({"config-name": 'nifi.security.keystoreType', 'item': self.getErrorItem('If NiFi Certificate Authority is not used and SSL is enabled, must specify nifi.security.keystoreType')})
-        if not properties['nifi.security.truststoreType']:
-          validationItems.append({"config-name": 'nifi.security.truststoreType', 'item': self.getErrorItem('If NiFi Certificate Authority is not used and SSL is enabled, must specify nifi.security.truststoreType')})
+        for prop_name in NIFI_SSL_REQUIRED_PROPERTIES:
+          if not properties[prop_name]:
+            validationItems.append({"config-name": prop_name, 'item': self.getErrorItem(NIFI_SSL_PROPERTY_REQUIRED_MESSAGE.format(prop_name))})
     return self.toConfigurationValidationProblems(validationItems, "nifi-ambari-ssl-config")
 
   def validateNiFiRangerPluginConfigurations(self, properties, recommendedDefaults, configurations, services, hosts):
-    validationItems = []
-    ranger_plugin_properties = getSiteProperties(configurations, "ranger-nifi-plugin-properties")
-    ranger_plugin_enabled = ranger_plugin_properties['ranger-nifi-plugin-enabled'] if ranger_plugin_properties else 'No'
-
-    if ranger_plugin_enabled.lower() == 'yes':
-      ranger_env = getServicesSiteProperties(services, 'ranger-env')
-      if not ranger_env or not 'ranger-nifi-plugin-enabled' in ranger_env or \
-                      ranger_env['ranger-nifi-plugin-enabled'].lower() != 'yes':
-        validationItems.append({"config-name": 'ranger-nifi-plugin-enabled',
-                                "item": self.getWarnItem(
-                                  "ranger-nifi-plugin-properties/ranger-nifi-plugin-enabled must correspond ranger-env/ranger-nifi-plugin-enabled")})
-
+    validationItems = self.getRangerPluginValidationItems(configurations, services, "nifi")
     return self.toConfigurationValidationProblems(validationItems, "ranger-nifi-plugin-properties")
 
   def validateServiceConfigurations(self, serviceName):
-    return self.getServiceConfigurationValidators().get(serviceName, None)
+    if self.serviceConfigurationValidators is None:
+      self.serviceConfigurationValidators = self.getServiceConfigurationValidators()
+    return self.serviceConfigurationValidators.get(serviceName, None)
 
   def getWarnItem(self, message):
     return {"level": "WARN", "message": message}
@@ -1459,18 +1466,14 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
 
   def getPreferredMountPoints(self, hostInfo):
 
-    # '/etc/resolv.conf', '/etc/hostname', '/etc/hosts' are docker specific mount points
-    undesirableMountPoints = ["/", "/home", "/etc/resolv.conf", "/etc/hosts",
-                              "/etc/hostname", "/tmp"]
-    undesirableFsTypes = ["devtmpfs", "tmpfs", "vboxsf", "CDFS"]
     mountPoints = []
     if hostInfo and "disk_info" in hostInfo:
       mountPointsDict = {}
       for mountpoint in hostInfo["disk_info"]:
-        if not (mountpoint["mountpoint"] in undesirableMountPoints or
+        if not (mountpoint["mountpoint"] in UNDESIRABLE_MOUNT_POINTS or
                 mountpoint["mountpoint"].startswith(("/boot", "/mnt")) or
-                mountpoint["type"] in undesirableFsTypes or
-                mountpoint["available"] == str(0)):
+                mountpoint["type"] in UNDESIRABLE_FS_TYPES or
+                mountpoint["available"] == "0"):
           mountPointsDict[mountpoint["mountpoint"]] = to_number(mountpoint["available"])
       if mountPointsDict:
         mountPoints = sorted(mountPointsDict, key=mountPointsDict.get, reverse=True)
@@ -1484,7 +1487,7 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     if not dir.startswith("file://") or dir == recommendedDefaults.get(propertyName):
       return None
 
-    dir = re.sub("^file://", "", dir, count=1)
+    dir = FILE_SCHEME_PATTERN.sub("", dir, count=1)
     mountPoints = []
     for mountPoint in hostInfo["disk_info"]:
       mountPoints.append(mountPoint["mountpoint"])
@@ -1502,22 +1505,22 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     if not dir.startswith("file://"):
       return None
 
-    dir = re.sub("^file://", "", dir, count=1)
+    dir = FILE_SCHEME_PATTERN.sub("", dir, count=1)
     mountPoints = {}
     for mountPoint in hostInfo["disk_info"]:
       mountPoints[mountPoint["mountpoint"]] = to_number(mountPoint["available"])
-    mountPoint = getMountPointForDir(dir, mountPoints.keys())
+    mountPoint = getMountPointForDir(dir, mountPoints.iterkeys())
 
     if not mountPoints:
       return self.getErrorItem("No disk info found on host %s" % hostInfo["host_name"])
 
     if mountPoint is None:
-      return self.getErrorItem("No mount point in directory %s. Mount points: %s" % (dir, ', '.join(mountPoints.keys())))
+      return self.getErrorItem("No mount point in directory %s. Mount points: %s" % (dir, ', '.join(mountPoints)))
 
     if mountPoints[mountPoint] < reqiuredDiskSpace:
       msg = "Ambari Metrics disk space requirements not met. \n" \
             "Recommended disk space for partition {0} is {1}G"
-      return self.getWarnItem(msg.format(mountPoint, reqiuredDiskSpace/1048576)) # in Gb
+      return self.getWarnItem(msg.format(mountPoint, reqiuredDiskSpace // 1048576)) # in Gb
     return None
 
   def validatorLessThenDefaultValue(self, properties, recommendedDefaults, propertyName):
@@ -1585,7 +1588,8 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
       defaultValueInt = int(str(defaultValue).strip())
       if valueInt < defaultValueInt:
         return self.getWarnItem("Value is less than the minimum recommended default of -Xmx" + str(defaultValue))
-    except:
+    except (ValueError, TypeError):
+      # not a number, nothing to compare
       return None
 
     return None
@@ -1611,13 +1615,13 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     return None
 
   def getMastersWithMultipleInstances(self):
-    return ['ZOOKEEPER_SERVER', 'METRICS_COLLECTOR']
+    return MASTERS_WITH_MULTIPLE_INSTANCES
 
   def getNotValuableComponents(self):
-    return ['METRICS_MONITOR']
+    return NOT_VALUABLE_COMPONENTS
 
   def getNotPreferableOnServerComponents(self):
-    return ['STORM_UI_SERVER', 'DRPC_SERVER', 'STORM_REST_API', 'NIMBUS', 'METRICS_COLLECTOR']
+    return NOT_PREFERABLE_ON_SERVER_COMPONENTS
 
   def getCardinalitiesDict(self, hosts):
     return {
@@ -1640,12 +1644,11 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
     if os.path.exists(login_defs):
       with open(login_defs, 'r') as f:
         data = f.read().split('\n')
-        # look for uid_min_tag in file
-        uid = filter(lambda x: uid_min_tag in x, data)
-        # filter all lines, where uid_min_tag was found in comments
-        uid = filter(lambda x: x.find(comment_tag) > x.find(uid_min_tag) or x.find(comment_tag) == -1, uid)
+        # look for uid_min_tag in file, skipping the lines where it was found in comments
+        uid = [x for x in data
+               if uid_min_tag in x and (x.find(comment_tag) > x.find(uid_min_tag) or x.find(comment_tag) == -1)]
 
-      if uid is not None and len(uid) > 0:
+      if uid:
         uid = uid[0]
         comment = uid.find(comment_tag)
         tag = uid.find(uid_min_tag)
@@ -1686,11 +1689,9 @@ class HDF20StackAdvisor(DefaultStackAdvisor):
 
 def getOldValue(self, services, configType, propertyName):
   if services:
-    if 'changed-configurations' in services.keys():
-      changedConfigs = services["changed-configurations"]
-      for changedConfig in changedConfigs:
-        if changedConfig["type"] == configType and changedConfig["name"]== propertyName and "old_value" in changedConfig:
-          return changedConfig["old_value"]
+    for changedConfig in services.get("changed-configurations", []):
+      if changedConfig["type"] == configType and changedConfig["name"]== propertyName and "old_value" in changedConfig:
+        return changedConfig["old_value"]
   return None
 
 # Validation helper methods
@@ -1709,20 +1710,43 @@ def getServicesSiteProperties(services, siteName):
     return None
   return siteConfig.get("properties")
 
+def getServicesProperty(services, siteName, propertyName, default=None):
+  """
+  Returns the property of the services payload, or default when the site or the property is not set.
+  """
+  properties = getServicesSiteProperties(services, siteName)
+  if properties is not None and propertyName in properties:
+    return properties[propertyName]
+  return default
+
+def getRecommendedOrServicesProperty(configurations, services, siteName, propertyName, default=None):
+  """
+  Returns the property as recommended so far, falling back to the value in the services payload.
+  """
+  properties = configurations.get(siteName, {}).get("properties", {})
+  if propertyName in properties:
+    return properties[propertyName]
+  return getServicesProperty(services, siteName, propertyName, default)
+
 def to_number(s):
   try:
-    return int(re.sub("\D", "", s))
+    return int(NON_DIGIT_PATTERN.sub("", s))
   except ValueError:
     return None
 
+# required for casting to the proper numeric type before comparison
+def convertToNumber(number):
+  try:
+    return int(number)
+  except ValueError:
+    return float(number)
+
 def checkXmxValueFormat(value):
-  p = re.compile('-Xmx(\d+)(b|k|m|g|p|t|B|K|M|G|P|T)?')
-  matches = p.findall(value)
+  matches = XMX_VALUE_PATTERN.findall(value)
   return len(matches) == 1
 
 def getXmxSize(value):
-  p = re.compile("-Xmx(\d+)(.?)")
-  result = p.findall(value)[0]
+  result = XMX_SIZE_PATTERN.findall(value)[0]
   if len(result) > 1:
     # result[1] - is a space or size formatter (b|k|m|g etc)
     return result[0] + result[1].lower()
@@ -1730,7 +1754,7 @@ def getXmxSize(value):
 
 def formatXmxSizeToBytes(value):
   value = value.lower()
-  if len(value) == 0:
+  if not value:
     return 0
   modifier = value[-1]
 
@@ -1752,7 +1776,7 @@ def getPort(address):
   """
   if address is None:
     return None
-  m = re.search(r'(?:http(?:s)?://)?([\w\d.]*):(\d{1,5})', address)
+  m = ADDRESS_PORT_PATTERN.search(address)
   if m is not None:
     return int(m.group(2))
   else:
@@ -1776,19 +1800,24 @@ def getMountPointForDir(dir, mountPoints):
   """
   bestMountFound = None
   if dir:
-    dir = re.sub("^file://", "", dir, count=1).strip().lower()
+    dir = FILE_SCHEME_PATTERN.sub("", dir, count=1).strip().lower()
+
+    # Ensure that the mount path and the dir path ends with "/"
+    # The mount point "/hadoop" should not match with the path "/hadoop1"
+    mountPointsIndex = {}
+    for mountPoint in mountPoints:
+      mountPointsIndex.setdefault(os.path.join(mountPoint, ""), mountPoint)
 
     # If the path is "/hadoop/hdfs/data", then possible matches for mounts could be
     # "/", "/hadoop/hdfs", and "/hadoop/hdfs/data".
-    # So take the one with the greatest number of segments.
-    for mountPoint in mountPoints:
-      # Ensure that the mount path and the dir path ends with "/"
-      # The mount point "/hadoop" should not match with the path "/hadoop1"
-      if os.path.join(dir, "").startswith(os.path.join(mountPoint, "")):
-        if bestMountFound is None:
-          bestMountFound = mountPoint
-        elif os.path.join(bestMountFound, "").count(os.path.sep) < os.path.join(mountPoint, "").count(os.path.sep):
-          bestMountFound = mountPoint
+    # So look the prefixes up from the longest one, which has the greatest number of segments.
+    dir = os.path.join(dir, "")
+    end = len(dir)
+    while True:
+      bestMountFound = mountPointsIndex.get(dir[:end])
+      if bestMountFound is not None or end == 0:
+        break
+      end = dir.rfind(os.path.sep, 0, end - 1) + 1
 
   return bestMountFound
 
@@ -1809,21 +1838,20 @@ def getHeapsizeProperties():
 
 def getMemorySizeRequired(components, configurations):
   totalMemoryRequired = 512*1024*1024 # 512Mb for OS needs
+  heapsizeProperties = getHeapsizeProperties()
   for component in components:
-    if component in getHeapsizeProperties().keys():
-      heapSizeProperties = getHeapsizeProperties()[component]
-      for heapSizeProperty in heapSizeProperties:
-        try:
-          properties = configurations[heapSizeProperty["config-name"]]["properties"]
-          heapsize = properties[heapSizeProperty["property"]]
-        except KeyError:
-          heapsize = heapSizeProperty["default"]
-
-        # Assume Mb if no modifier
-        if len(heapsize) > 1 and heapsize[-1] in '0123456789':
-          heapsize = str(heapsize) + "m"
-
-        totalMemoryRequired += formatXmxSizeToBytes(heapsize)
+    for heapSizeProperty in heapsizeProperties.get(component, []):
+      try:
+        properties = configurations[heapSizeProperty["config-name"]]["properties"]
+        heapsize = properties[heapSizeProperty["property"]]
+      except KeyError:
+        heapsize = heapSizeProperty["default"]
+
+      # Assume Mb if no modifier
+      if len(heapsize) > 1 and heapsize[-1] in '0123456789':
+        heapsize += "m"
+
+      totalMemoryRequired += formatXmxSizeToBytes(heapsize)
 
   return totalMemoryRequired
 
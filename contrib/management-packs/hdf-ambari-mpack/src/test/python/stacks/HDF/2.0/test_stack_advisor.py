@@ -0,0 +1,376 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import sys
+from unittest import TestCase
+
+
+class TestHDF20StackAdvisor(TestCase):
+  def setUp(self):
+    import imp
+    self.maxDiff = None
+    self.testDirectory = os.path.dirname(os.path.abspath(__file__))
+
+    mpackPath = os.path.abspath(os.path.join(self.testDirectory, '../../../../../..'))
+    ambariPath = os.path.abspath(os.path.join(mpackPath, '../../..'))
+    stacksPath = os.path.join(ambariPath, 'ambari-server/src/main/resources/stacks')
+    for path in (stacksPath, os.path.join(ambariPath, 'ambari-common/src/main/python')):
+      if path not in sys.path:
+        sys.path.append(path)
+
+    ambariConfigurationPath = os.path.join(stacksPath, 'ambari_configuration.py')
+    with open(ambariConfigurationPath, 'rb') as fp:
+      imp.load_module('ambari_configuration', fp, ambariConfigurationPath, ('.py', 'rb', imp.PY_SOURCE))
+
+    stackAdvisorPath = os.path.join(stacksPath, 'stack_advisor.py')
+    with open(stackAdvisorPath, 'rb') as fp:
+      imp.load_module('stack_advisor', fp, stackAdvisorPath, ('.py', 'rb', imp.PY_SOURCE))
+
+    hdfStackAdvisorPath = os.path.join(mpackPath, 'src/main/resources/stacks/HDF/2.0/services/stack_advisor.py')
+    with open(hdfStackAdvisorPath, 'rb') as fp:
+      self.stack_advisor_impl = imp.load_module('stack_advisor_impl', fp, hdfStackAdvisorPath, ('.py', 'rb', imp.PY_SOURCE))
+
+    self.stackAdvisor = self.stack_advisor_impl.HDF20StackAdvisor()
+
+  def test_getMountPointForDir(self):
+    getMountPointForDir = self.stack_advisor_impl.getMountPointForDir
+
+    self.assertEquals(None, getMountPointForDir(None, ["/", "/hadoop"]))
+    self.assertEquals(None, getMountPointForDir("", ["/", "/hadoop"]))
+    self.assertEquals(None, getMountPointForDir("/hadoop/hdfs", []))
+
+    # the mount point with the greatest number of segments wins
+    mountPoints = ["/", "/hadoop", "/hadoop/hdfs", "/hadoop/hdfs/data"]
+    self.assertEquals("/hadoop/hdfs/data", getMountPointForDir("/hadoop/hdfs/data", mountPoints))
+    self.assertEquals("/hadoop/hdfs", getMountPointForDir("/hadoop/hdfs/data1", mountPoints))
+    self.assertEquals("/hadoop", getMountPointForDir("/hadoop/yarn/local", mountPoints))
+    self.assertEquals("/", getMountPointForDir("/hadoop1/hdfs", mountPoints))
+    self.assertEquals("/", getMountPointForDir("/", mountPoints))
+    self.assertEquals("/hadoop/hdfs/data", getMountPointForDir("/hadoop/hdfs/data", list(reversed(mountPoints))))
+
+    # trailing separators on the directory and on the mount point
+    self.assertEquals("/hadoop", getMountPointForDir("/hadoop/", ["/", "/hadoop"]))
+    self.assertEquals("/hadoop", getMountPointForDir("/hadoop//", ["/", "/hadoop"]))
+    self.assertEquals("/hadoop/", getMountPointForDir("/hadoop/hdfs", ["/", "/hadoop/"]))
+    self.assertEquals("/hadoop/", getMountPointForDir("/hadoop", ["/", "/hadoop/"]))
+    self.assertEquals("/", getMountPointForDir("/hadoop/hdfs", ["/", "/hadoop//"]))
+    self.assertEquals("/hadoop//", getMountPointForDir("/hadoop//hdfs", ["/", "/hadoop//"]))
+    self.assertEquals("//", getMountPointForDir("//hadoop/hdfs", ["/", "//"]))
+
+    # duplicate mount points, the first one listed is returned
+    self.assertEquals("/hadoop", getMountPointForDir("/hadoop/hdfs", ["/", "/hadoop", "/hadoop"]))
+    self.assertEquals("/hadoop/", getMountPointForDir("/hadoop/hdfs", ["/", "/hadoop/", "/hadoop"]))
+    self.assertEquals("/hadoop", getMountPointForDir("/hadoop/hdfs", ["/", "/hadoop", "/hadoop/"]))
+    self.assertEquals("/", getMountPointForDir("/data", ["/", "/"]))
+
+    # relative directories and mount points
+    self.assertEquals(None, getMountPointForDir("hadoop/hdfs", ["/", "/hadoop"]))
+    self.assertEquals("hadoop", getMountPointForDir("hadoop/hdfs", ["/", "hadoop"]))
+    self.assertEquals(None, getMountPointForDir("hadoop1/hdfs", ["/", "hadoop"]))
+    self.assertEquals("", getMountPointForDir("hadoop/hdfs", ["/", ""]))
+    self.assertEquals("/", getMountPointForDir("/hadoop/hdfs", ["", "/"]))
+
+    # the file scheme is stripped once, the directory is lower cased and stripped
+    self.assertEquals("/hadoop", getMountPointForDir("file:///hadoop/hdfs", ["/", "/hadoop"]))
+    self.assertEquals(None, getMountPointForDir("file://file:///hadoop/hdfs", ["/", "/hadoop"]))
+    self.assertEquals("/hadoop", getMountPointForDir("  /Hadoop/HDFS  ", ["/", "/hadoop"]))
+    self.assertEquals("/", getMountPointForDir("/Hadoop/hdfs", ["/", "/Hadoop"]))
+    self.assertEquals("/", getMountPointForDir("/hadoop/../hdfs", ["/", "/hdfs"]))
+
+  def test_round_to_n(self):
+    round_to_n = self.stack_advisor_impl.round_to_n
+
+    self.assertEquals(0, round_to_n(0))
+    self.assertEquals(0, round_to_n(63))
+    self.assertEquals(128, round_to_n(64))
+    self.assertEquals(128, round_to_n(191))
+    self.assertEquals(256, round_to_n(192))
+    self.assertEquals(1024, round_to_n(1000))
+    self.assertEquals(1536, round_to_n(1500, 512))
+    self.assertEquals(1024, round_to_n(1279, 512))
+    self.assertEquals(1536, round_to_n(1280, 512))
+    self.assertEquals(256, round_to_n(256.0, 256.0))
+    self.assertEquals(int, type(round_to_n(1000.0)))
+
+    # halves are rounded away from zero
+    self.assertEquals(1, round_to_n(0.5, 1))
+    self.assertEquals(3, round_to_n(2.5, 1))
+    self.assertEquals(-1, round_to_n(-0.5, 1))
+    self.assertEquals(-3, round_to_n(-2.5, 1))
+    self.assertEquals(-128, round_to_n(-64))
+    self.assertEquals(-256, round_to_n(-192))
+    self.assertEquals(0, round_to_n(-63))
+
+  def test_getConfigurationClusterSummary_memoryBrackets(self):
+    # (host RAM in GB, reservedRam, hbaseRam, minContainerSize), on and just above every bracket bound
+    expectedBrackets = [(0, 1, 1, 256), (4, 1, 1, 256), (5, 2, 1, 512), (8, 2, 1, 512), (9, 2, 2, 1024),
+                        (16, 2, 2, 1024), (17, 4, 4, 1024), (24, 4, 4, 1024), (25, 6, 8, 2048), (48, 6, 8, 2048),
+                        (49, 8, 8, 2048), (64, 8, 8, 2048), (65, 8, 8, 2048), (72, 8, 8, 2048), (73, 12, 16, 2048),
+                        (96, 12, 16, 2048), (97, 24, 24, 2048), (128, 24, 24, 2048), (129, 32, 32, 2048),
+                        (256, 32, 32, 2048), (257, 64, 32, 2048)]
+
+    for ram, reservedRam, hbaseRam, minContainerSize in expectedBrackets:
+      # total_mem is in KB, the leftover KB are dropped from the RAM in GB
+      for total_mem in (ram * 1024 * 1024, ram * 1024 * 1024 + 1024 * 1024 - 1):
+        hosts = {"items": [{"Hosts": {"host_name": "host1", "cpu_count": 8, "disk_info": [{}] * 6, "total_mem": total_mem}}]}
+        cluster = self.stackAdvisor.getConfigurationClusterSummary([], hosts, [], {"services": []})
+        self.assertEquals((ram, reservedRam, hbaseRam, minContainerSize),
+                          (cluster["ram"], cluster["reservedRam"], cluster["hbaseRam"], cluster["minContainerSize"]))
+
+    host = {"host_name": "host1", "cpu_count": 8, "disk_info": [{}] * 6, "total_mem": 32 * 1024 * 1024}
+    expected = {
+      "cpu": 8,
+      "disk": 6,
+      "ram": 32,
+      "hBaseInstalled": False,
+      "components": [],
+      "referenceHost": host,
+      "reservedRam": 6,
+      "hbaseRam": 8,
+      "minContainerSize": 2048,
+      "totalAvailableRam": 26624,
+      "containers": 11,
+      "ramPerContainer": 2048,
+      "mapMemory": 2048,
+      "reduceMemory": 2048,
+      "amMemory": 2048
+    }
+    self.assertEquals(expected, self.stackAdvisor.getConfigurationClusterSummary([], {"items": [{"Hosts": host}]}, [], {"services": []}))
+
+  def test_putProperties(self):
+    services = {
+      "services": [],
+      "configurations": {
+        "ranger-ugsync-site": {
+          "properties": {
+            "ranger.usersync.ldap.url": "ldap://user-set:389",
+            "ranger.usersync.group.searchbase": "ou=user-set"
+          }
+        }
+      },
+      "changed-configurations": [
+        {"type": "ranger-ugsync-site", "name": "ranger.usersync.ldap.url", "old_value": "ldap://old:389"},
+        {"type": "ranger-admin-site", "name": "ranger.usersync.group.searchbase", "old_value": ""}
+      ]
+    }
+    properties = {
+      "ranger.usersync.ldap.url": "ldap://recommended:389",
+      "ranger.usersync.group.searchbase": "ou=recommended",
+      "ranger.usersync.ldap.deltasync": True,
+      "ranger.usersync.sleeptimeinmillisbetweensynccycle": 60000,
+      "ranger.usersync.pagedresultssize": 500.5,
+      "ranger.usersync.ldap.binddn": u"cn=admin"
+    }
+    expected = {
+      "ranger-ugsync-site": {
+        "properties": {
+          "ranger.usersync.source.impl.class": "ldap",
+          # changed by the user, the user's value is kept
+          "ranger.usersync.ldap.url": "ldap://user-set:389",
+          # only changed in another config type, the recommended value is used
+          "ranger.usersync.group.searchbase": "ou=recommended",
+          "ranger.usersync.ldap.deltasync": "True",
+          "ranger.usersync.sleeptimeinmillisbetweensynccycle": "60000",
+          "ranger.usersync.pagedresultssize": "500.5",
+          "ranger.usersync.ldap.binddn": "cn=admin"
+        }
+      }
+    }
+
+    configurations = {"ranger-ugsync-site": {"properties": {"ranger.usersync.source.impl.class": "ldap"}}}
+    self.stackAdvisor.putProperties(configurations, "ranger-ugsync-site", properties, services)
+    self.assertEquals(expected, configurations)
+
+    # the bulk setter puts the same values as one putProperty call per property
+    configurations = {"ranger-ugsync-site": {"properties": {"ranger.usersync.source.impl.class": "ldap"}}}
+    putRangerUgsyncSiteProperty = self.stackAdvisor.putProperty(configurations, "ranger-ugsync-site", services)
+    for key, value in properties.iteritems():
+      putRangerUgsyncSiteProperty(key, value)
+    self.assertEquals(expected, configurations)
+
+    # without services, or without changed configurations, every value is recommended
+    for putServices in (None, {"services": [], "configurations": services["configurations"]}):
+      configurations = {}
+      self.stackAdvisor.putProperties(configurations, "ranger-ugsync-site", {"ranger.usersync.ldap.url": "ldap://recommended:389"}, putServices)
+      self.assertEquals({"ranger-ugsync-site": {"properties": {"ranger.usersync.ldap.url": "ldap://recommended:389"}}}, configurations)
+
+    # the config type is created even when there is nothing to put
+    configurations = {"ranger-ugsync-site": {}}
+    self.stackAdvisor.putProperties(configurations, "ranger-ugsync-site", {}, services)
+    self.stackAdvisor.putProperties(configurations, "ranger-admin-site", {}, services)
+    self.assertEquals({"ranger-ugsync-site": {"properties": {}}, "ranger-admin-site": {"properties": {}}}, configurations)
+
+  def test_getRangerPluginValidationItems(self):
+    validators = {
+      "kafka": self.stackAdvisor.validateKafkaRangerPluginConfigurations,
+      "storm": self.stackAdvisor.validateStormRangerPluginConfigurations,
+      "nifi": self.stackAdvisor.validateNiFiRangerPluginConfigurations
+    }
+    kerberosOnlyMessages = {
+      "kafka": "Ranger Kafka plugin should not be enabled in non-kerberos environment.",
+      "storm": "Ranger Storm plugin should not be enabled in non-kerberos environment."
+    }
+
+    def validate(serviceName, pluginEnabled, rangerEnvEnabled, serviceNames):
+      pluginProperty = "ranger-{0}-plugin-enabled".format(serviceName)
+      configurations = {}
+      if pluginEnabled is not None:
+        configurations["ranger-{0}-plugin-properties".format(serviceName)] = {"properties": {pluginProperty: pluginEnabled}}
+      services = {"services": [{"StackServices": {"service_name": name}} for name in serviceNames], "configurations": {}}
+      if rangerEnvEnabled is not None:
+        services["configurations"]["ranger-env"] = {"properties": {pluginProperty: rangerEnvEnabled}}
+      return validators[serviceName]({}, {}, configurations, services, {})
+
+    def warning(serviceName, message):
+      return {"type": "configuration", "level": "WARN", "message": message,
+              "config-type": "ranger-{0}-plugin-properties".format(serviceName),
+              "config-name": "ranger-{0}-plugin-enabled".format(serviceName)}
+
+    for serviceName in ("kafka", "storm", "nifi"):
+      mismatch = warning(serviceName, "ranger-{0}-plugin-properties/ranger-{0}-plugin-enabled must correspond ranger-env/ranger-{0}-plugin-enabled".format(serviceName))
+      kerberosOnly = [warning(serviceName, kerberosOnlyMessages[serviceName])] if serviceName in kerberosOnlyMessages else []
+
+      # a disabled or unset plugin is never reported
+      for pluginEnabled in (None, "No", "false"):
+        self.assertEquals([], validate(serviceName, pluginEnabled, None, ["RANGER"]))
+        self.assertEquals([], validate(serviceName, pluginEnabled, "Yes", ["RANGER"]))
+
+      for pluginEnabled in ("Yes", "yes", "true"):
+        self.assertEquals([], validate(serviceName, pluginEnabled, "Yes", ["RANGER", "KERBEROS"]))
+        self.assertEquals([], validate(serviceName, pluginEnabled, "TRUE", ["RANGER", "KERBEROS"]))
+        self.assertEquals([mismatch], validate(serviceName, pluginEnabled, None, ["RANGER", "KERBEROS"]))
+        self.assertEquals([mismatch], validate(serviceName, pluginEnabled, "No", ["RANGER", "KERBEROS"]))
+        self.assertEquals([], validate(serviceName, pluginEnabled, "Yes", ["KAFKA"]))
+        self.assertEquals(kerberosOnly, validate(serviceName, pluginEnabled, "Yes", ["RANGER"]))
+        self.assertEquals([mismatch] + kerberosOnly, validate(serviceName, pluginEnabled, "No", ["RANGER"]))
+
+      # the items are not wrapped into validation problems
+      self.assertEquals([], self.stackAdvisor.getRangerPluginValidationItems({}, {"services": []}, serviceName))
+
+  def test_recommendKAFKAConfigurations_rangerPluginEnabled(self):
+    rangerAuthorizer = 'org.apache.ranger.authorization.kafka.authorizer.RangerKafkaAuthorizer'
+    kafkaLog4jContent = "log4j.rootLogger=INFO, stdout"
+    rangerLog4jContent = "\n".join([kafkaLog4jContent,
+                                    "log4j.appender.rangerAppender=org.apache.log4j.DailyRollingFileAppender",
+                                    "log4j.appender.rangerAppender.DatePattern='.'yyyy-MM-dd-HH",
+                                    "log4j.appender.rangerAppender.File=${kafka.logs.dir}/ranger_kafka.log",
+                                    "log4j.appender.rangerAppender.layout=org.apache.log4j.PatternLayout",
+                                    "log4j.appender.rangerAppender.layout.ConversionPattern=%d{ISO8601} %p [%t] %C{6} (%F:%L) - %m%n",
+                                    "log4j.logger.org.apache.ranger=INFO, rangerAppender"])
+
+    def recommend(pluginEnabled):
+      services = {
+        "services": [{"StackServices": {"service_name": "KAFKA"}}, {"StackServices": {"service_name": "RANGER"}}],
+        "configurations": {
+          "ranger-env": {"properties": {"ranger-kafka-plugin-enabled": pluginEnabled}},
+          "ranger-kafka-plugin-properties": {"properties": {"ranger-kafka-plugin-enabled": "No"}},
+          "kafka-log4j": {"properties": {"content": kafkaLog4jContent}}
+        }
+      }
+      configurations = {}
+      self.stackAdvisor.recommendKAFKAConfigurations(configurations, {}, services, None)
+      return configurations
+
+    # 'true' turns the plugin on just like 'Yes', whatever the case
+    for pluginEnabled in ("Yes", "yes", "true", "TRUE"):
+      configurations = recommend(pluginEnabled)
+      self.assertEquals(pluginEnabled, configurations["ranger-kafka-plugin-properties"]["properties"]["ranger-kafka-plugin-enabled"])
+      self.assertEquals(rangerAuthorizer, configurations["kafka-broker"]["properties"]["authorizer.class.name"])
+      self.assertEquals(rangerLog4jContent, configurations["kafka-log4j"]["properties"]["content"])
+
+    for pluginEnabled in ("No", "false"):
+      configurations = recommend(pluginEnabled)
+      self.assertFalse("authorizer.class.name" in configurations["kafka-broker"]["properties"])
+      self.assertEquals({"delete": "true"}, configurations["kafka-broker"]["property_attributes"]["authorizer.class.name"])
+      self.assertFalse("content" in configurations["kafka-log4j"]["properties"])
+
+  def test_recommendNIFIConfigurations_rangerPluginEnabled(self):
+    def recommend(pluginEnabled):
+      services = {
+        "services": [{"StackServices": {"service_name": "NIFI"}}, {"StackServices": {"service_name": "RANGER"}}],
+        "configurations": {
+          "ranger-env": {"properties": {"ranger-nifi-plugin-enabled": pluginEnabled}},
+          "ranger-nifi-plugin-properties": {"properties": {"ranger-nifi-plugin-enabled": "No", "nifi.authentication": "NONE"}},
+          "nifi-ambari-ssl-config": {"properties": {"nifi.node.ssl.isenabled": "true"}}
+        }
+      }
+      configurations = {}
+      self.stackAdvisor.recommendNIFIConfigurations(configurations, {}, services, None)
+      return configurations["ranger-nifi-plugin-properties"]["properties"]
+
+    for pluginEnabled in ("Yes", "yes", "true", "TRUE"):
+      self.assertEquals({"ranger-nifi-plugin-enabled": pluginEnabled, "nifi.authentication": "SSL"}, recommend(pluginEnabled))
+
+    for pluginEnabled in ("No", "false"):
+      self.assertEquals({"ranger-nifi-plugin-enabled": pluginEnabled}, recommend(pluginEnabled))
+
+  def test_validateRangerConfigurationsEnv(self):
+    def validate(rangerEnv, serviceNames):
+      services = {"services": [{"StackServices": {"service_name": name}} for name in serviceNames], "configurations": {}}
+      return self.stackAdvisor.validateRangerConfigurationsEnv(rangerEnv, {}, {}, services, {})
+
+    def warning(pluginProperty, message):
+      return {"type": "configuration", "level": "WARN", "message": message,
+              "config-type": "ranger-env", "config-name": pluginProperty}
+
+    stormWarning = warning("ranger-storm-plugin-enabled", "Ranger Storm plugin should not be enabled in non-kerberos environment.")
+    kafkaWarning = warning("ranger-kafka-plugin-enabled", "Ranger Kafka plugin should not be enabled in non-kerberos environment.")
+
+    for pluginEnabled in ("Yes", "yes", "true", "TRUE"):
+      rangerEnv = {"ranger-storm-plugin-enabled": pluginEnabled, "ranger-kafka-plugin-enabled": pluginEnabled}
+      self.assertEquals([stormWarning, kafkaWarning], validate(rangerEnv, ["RANGER"]))
+      self.assertEquals([kafkaWarning], validate({"ranger-kafka-plugin-enabled": pluginEnabled}, ["RANGER"]))
+      self.assertEquals([], validate(rangerEnv, ["RANGER", "KERBEROS"]))
+
+      # the plugin validators report the same kerberos-only warning for a 'true' flag
+      configurations = {"ranger-kafka-plugin-properties": {"properties": {"ranger-kafka-plugin-enabled": pluginEnabled}}}
+      services = {"services": [{"StackServices": {"service_name": "RANGER"}}],
+                  "configurations": {"ranger-env": {"properties": {"ranger-kafka-plugin-enabled": pluginEnabled}}}}
+      self.assertEquals([{"config-name": "ranger-kafka-plugin-enabled", "item": self.stackAdvisor.getWarnItem(kafkaWarning["message"])}],
+                        self.stackAdvisor.getRangerPluginValidationItems(configurations, services, "kafka"))
+
+    for pluginEnabled in ("No", "false", ""):
+      rangerEnv = {"ranger-storm-plugin-enabled": pluginEnabled, "ranger-kafka-plugin-enabled": pluginEnabled}
+      self.assertEquals([], validate(rangerEnv, ["RANGER"]))
+    self.assertEquals([], validate({}, ["RANGER"]))
+
+  def test_getRequestContext(self):
+    services = {"services": [{"StackServices": {"service_name": "KAFKA"}}], "changed-configurations": []}
+    otherServices = {"services": [{"StackServices": {"service_name": "STORM"}}], "changed-configurations": []}
+
+    # outside of an action every call gets its own context
+    self.assertFalse(self.stackAdvisor.getRequestContext(services) is self.stackAdvisor.getRequestContext(services))
+
+    def action(actionServices, hosts):
+      context = self.stackAdvisor.getRequestContext(actionServices)
+      self.assertTrue(context is self.stackAdvisor.getRequestContext(actionServices))
+      # a config group pass hands in a shallow copy of the payload
+      configGroupServices = actionServices.copy()
+      configGroupServices["configurations"] = {}
+      self.assertTrue(context is self.stackAdvisor.getRequestContext(configGroupServices))
+      # any other payload gets a context of its own
+      otherContext = self.stackAdvisor.getRequestContext(otherServices)
+      self.assertFalse(otherContext is context)
+      self.assertEquals(frozenset(["STORM"]), otherContext.servicesSet)
+      changedServices = dict(actionServices, **{"changed-configurations": [{"type": "kafka-broker", "name": "port"}]})
+      self.assertEquals(frozenset(["port"]), self.stackAdvisor.getRequestContext(changedServices).getChangedProperties("kafka-broker"))
+      return context.servicesSet
+
+    self.assertEquals(frozenset(["KAFKA"]), self.stackAdvisor.runWithRequestContext(action, services, None))
+    self.assertEquals(None, self.stackAdvisor.requestContext)